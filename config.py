@@ -220,8 +220,11 @@ N_PROCESSES = cpu_count()
 CACHING_GRANULARITY = 'OBJECT'
 
 # Format in which results are saved.
-# Result readers and writers are located in module ./icarus/results/readwrite.py
-# Currently only PICKLE is supported 
+# Result readers and writers are located in modules ./icarus/results/readwrite.py
+# and ./icarus/results/columnar.py
+# PICKLE saves the whole result set in a single file. COLUMNAR saves it in a
+# directory, storing scalar metrics by column so that large result sets can be
+# loaded and filtered quickly
 RESULTS_FORMAT = 'PICKLE'
 
 # Number of times each experiment is replicated
@@ -20,6 +20,48 @@ PARALLEL_EXECUTION = True
 # This option is ignored if PARALLEL_EXECUTION = False
 N_PROCESSES = 1 #cpu_count()
 
+# File where the durations of experiments are recorded across runs. They are
+# used to dispatch the longest experiments first and to estimate the
+# remaining time. If None, durations are not recorded
+COST_HISTORY = 'durations.json'
+
+# Relative cost of strategies, used to estimate the duration of experiments
+# never executed before. Strategies not listed have a cost of 1
+STRATEGY_COST_FACTORS = {}
+
+# If True, topologies and their shortest paths are built once before running
+# the experiments, and shared by all experiments and processes
+PREBUILD_TOPOLOGIES = True
+
+# If True, experiments are not executed locally but served to worker agents,
+# possibly running on other hosts, which connect to this process. Workers are
+# launched with:
+#   python icarus-worker.py --address HOST:PORT --authkey KEY --agents N
+# PARALLEL_EXECUTION and N_PROCESSES are ignored
+DISTRIBUTED_EXECUTION = False
+
+# Address on which workers connect, either a (host, port) tuple or the path of
+# a Unix socket, and key used to authenticate them
+COORDINATOR_ADDRESS = ('0.0.0.0', 5555)
+COORDINATOR_AUTHKEY = 'icarus'
+
+# Time (in seconds) after which a silent worker agent is considered dead and
+# its experiment is executed by another agent
+HEARTBEAT_TIMEOUT = 30
+
+# Directory where results of experiments are cached. Experiments whose
+# results are in the cache are not executed again, unless their parameters,
+# DATA_COLLECTORS or the code of the components they use changed. Cache
+# entries can be inspected and removed with scripts/resultcache.py.
+# If None, results are not cached
+RESULT_CACHE = None
+
+# If not None, the event loop of each experiment is profiled by sampling the
+# code being executed every PROFILE_INTERVAL seconds of CPU time, and the
+# fraction of time spent in each phase of event processing is reported in
+# the PERF subtree of the results
+PROFILE_INTERVAL = None
+
 # Granularity of caching.
 # Currently, only OBJECT is supported
 CACHING_GRANULARITY = 'OBJECT'
@@ -27,11 +69,29 @@ CACHING_GRANULARITY = 'OBJECT'
 # Warm-up strategy
 WARMUP_STRATEGY = 'HUF'
 
+# If True, experiments differing only in the strategy share the warm-up phase,
+# which is executed once with WARMUP_STRATEGY. The warm state is then forked
+# into a measurement phase for each strategy (POSIX systems only)
+SHARED_WARMUP = False
+
 # Format in which results are saved.
-# Result readers and writers are located in module ./icarus/results/readwrite.py
-# Currently only PICKLE is supported 
+# Result readers and writers are located in modules ./icarus/results/readwrite.py
+# and ./icarus/results/columnar.py
+# PICKLE saves the whole result set in a single file. COLUMNAR saves it in a
+# directory, storing scalar metrics by column so that large result sets can be
+# loaded and filtered quickly. Existing pickles can be converted with
+# ./scripts/convertresults.py
 RESULTS_FORMAT = 'PICKLE'
 
+# Minimum wall-clock time (in seconds) between two checkpoints of the state of
+# an in-flight experiment. If an experiment is interrupted, it is resumed from
+# its latest checkpoint when the simulation is launched again.
+# If None, checkpointing is disabled
+CHECKPOINT_INTERVAL = None
+
+# Directory where checkpoints are saved
+CHECKPOINT_DIR = 'checkpoints'
+
 # Number of times each experiment is replicated
 # This is necessary for extracting confidence interval of selected metrics
 N_REPLICATIONS = 1
@@ -70,7 +130,16 @@ NETWORK_REQUEST_RATE = 100.0
 
 # Number of content requests generated to prepopulate the caches
 # These requests are not logged
-N_WARMUP_REQUESTS = 0 #30000
+# If AUTO_WARMUP is True, this is the maximum number of warm-up requests
+N_WARMUP_REQUESTS = 30000
+
+# If True, the end of the warm-up is detected automatically (MSER-5) from the
+# deadline satisfaction of warm-up requests
+AUTO_WARMUP = True
+
+# Minimum number of warm-up requests before the end of the warm-up can be
+# detected (ignored if AUTO_WARMUP is False)
+MIN_WARMUP_REQUESTS = 2000
 
 # Number of content requests generated after the warmup and logged
 # to generate results. 
@@ -103,6 +172,8 @@ default['workload'] = {'name':       'STATIONARY',
                        'n_contents': N_CONTENTS,
                        'n_warmup':   N_WARMUP_REQUESTS,
                        'n_measured': N_MEASURED_REQUESTS,
+                       'auto_warmup': AUTO_WARMUP,
+                       'min_warmup': MIN_WARMUP_REQUESTS,
                        'rate':       NETWORK_REQUEST_RATE,
                        'seed':  0,
                        'n_services': N_SERVICES
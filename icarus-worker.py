@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""Run an Icarus worker executing experiments served by a coordinator.
+
+The coordinator is an instance of Icarus launched with the
+DISTRIBUTED_EXECUTION setting enabled. Workers can be launched on any host
+able to connect to the coordinator, before or after it starts.
+"""
+import sys
+import os
+import argparse
+
+def main():
+    src_dir = os.path.abspath(os.path.dirname(__file__))
+    sys.path.insert(0, src_dir)
+    from icarus import __version__
+    from icarus.util import config_logging
+    from icarus.distributed import run_worker
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("-a", "--address", dest="address", required=True,
+                        help='address of the coordinator, either HOST:PORT '
+                             'or the path of a Unix socket')
+    parser.add_argument("-k", "--authkey", dest="authkey", required=True,
+                        help='key used to authenticate with the coordinator')
+    parser.add_argument("-n", "--agents", dest="agents", type=int, default=1,
+                        help='number of experiments executed in parallel')
+    parser.add_argument("-l", "--log-level", dest="log_level", default='INFO',
+                        help='logging level')
+    parser.add_argument('-v', '--version', action='version',
+                        version="icarus {}".format(__version__))
+    args = parser.parse_args()
+    host, sep, port = args.address.rpartition(':')
+    address = (host, int(port)) if sep and port.isdigit() else args.address
+    config_logging(args.log_level)
+    run_worker(address, args.authkey, args.agents)
+
+if __name__ == "__main__":
+    main()
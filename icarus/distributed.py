@@ -0,0 +1,302 @@
+# -*- coding: utf-8 -*-
+"""Execute experiments on multiple hosts.
+
+A `Coordinator` serves a queue of jobs over a TCP or Unix socket to worker
+agents, which can run on any host able to connect to it. Each agent pulls a
+job, executes it and sends its result back to the coordinator, then pulls the
+next one. While executing a job, agents periodically send heartbeats to the
+coordinator. If an agent disconnects or stops sending heartbeats, the job
+assigned to it is queued again and later executed by another agent.
+
+Jobs are expressed as a function and its arguments, which are pickled and
+sent to agents. Functions must therefore be importable by the agents, i.e.
+agents must run the same version of Icarus as the coordinator.
+
+Connections are authenticated with a shared key, but messages are not
+encrypted. Coordinators should only be reachable from trusted networks.
+"""
+from __future__ import division
+import time
+import select
+import logging
+import threading
+import collections
+import traceback
+import multiprocessing as mp
+from multiprocessing.connection import Listener, Client, AuthenticationError
+
+try:
+    import Queue as queue
+except ImportError:
+    import queue
+
+
+__all__ = [
+    'Coordinator',
+    'run_worker'
+           ]
+
+
+logger = logging.getLogger('distributed')
+
+
+class Coordinator(object):
+    """Coordinator of the execution of jobs by remote worker agents.
+
+    Jobs are submitted with `submit`, similarly to `multiprocessing.Pool`'s
+    `apply_async`, and executed by calling `run`, which returns once all
+    jobs completed.
+    """
+
+    def __init__(self, address, authkey, setup=None, heartbeat_timeout=30):
+        """Constructor
+
+        Parameters
+        ----------
+        address : tuple or str
+            The (host, port) address of the TCP socket or the path of the
+            Unix socket on which the coordinator listens
+        authkey : str
+            The key used to authenticate agents
+        setup : tuple, optional
+            A (function, args) tuple which is executed once by each
+            worker, before starting its agents
+        heartbeat_timeout : float, optional
+            The time (in seconds) after which an agent which did not send any
+            message is considered dead
+        """
+        self.address = address
+        self.authkey = authkey
+        self.setup = setup
+        self.heartbeat_timeout = heartbeat_timeout
+        # Queue of jobs to execute. Each job is a (job_id, func, args) tuple
+        self.jobs = collections.deque()
+        # Callbacks of jobs not completed yet, keyed by job ID
+        self.callbacks = {}
+        # Job assigned to each connected agent (None if idle) and time of the
+        # last message received from it, keyed by connection
+        self.assigned = {}
+        self.last_seen = {}
+        # Maximum number of agents connected at the same time
+        self.max_agents = 0
+        self._next_id = 0
+        self._stop = False
+        self._listener = None
+
+    @property
+    def n_agents(self):
+        """The number of connected agents"""
+        return len(self.assigned)
+
+    def submit(self, func, args, callback):
+        """Submit a job
+
+        Parameters
+        ----------
+        func : callable
+            The function to execute
+        args : tuple
+            The arguments of the function
+        callback : callable
+            The function called, in the coordinator process, with the value
+            returned by the job
+        """
+        self.jobs.append((self._next_id, func, args))
+        self.callbacks[self._next_id] = callback
+        self._next_id += 1
+
+    def stop(self):
+        """Stop the coordinator and all connected agents"""
+        self._stop = True
+        for conn in list(self.assigned):
+            try:
+                conn.send(('stop',))
+            except (IOError, EOFError):
+                pass
+            conn.close()
+        self.assigned.clear()
+        self.last_seen.clear()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+
+    def run(self):
+        """Serve jobs to agents until all jobs completed.
+
+        This call is blocking.
+        """
+        self._listener = Listener(self.address, authkey=self.authkey)
+        logger.info('Coordinator listening on %s', str(self._listener.address))
+        new_conns = queue.Queue()
+        acceptor = threading.Thread(target=self._accept,
+                                    args=(self._listener, new_conns))
+        acceptor.daemon = True
+        acceptor.start()
+        while self.callbacks and not self._stop:
+            while not new_conns.empty():
+                conn = new_conns.get()
+                self.assigned[conn] = None
+                self.last_seen[conn] = time.time()
+                self.max_agents = max(self.max_agents, self.n_agents)
+            if self.assigned:
+                ready = select.select(list(self.assigned), [], [], 1)[0]
+            else:
+                time.sleep(1)
+                ready = []
+            for conn in ready:
+                if conn not in self.assigned:
+                    # Dropped while handling a previous message
+                    continue
+                try:
+                    msg = conn.recv()
+                except (IOError, EOFError):
+                    self._drop(conn, 'Agent disconnected')
+                    continue
+                self.last_seen[conn] = time.time()
+                self._handle(conn, msg)
+            now = time.time()
+            for conn, t in list(self.last_seen.items()):
+                if now - t > self.heartbeat_timeout:
+                    self._drop(conn, 'Agent did not send heartbeats for %ds'
+                               % self.heartbeat_timeout)
+        self.stop()
+
+    def _accept(self, listener, new_conns):
+        """Accept connections from agents and put them in a queue"""
+        while not self._stop:
+            try:
+                new_conns.put(listener.accept())
+            except AuthenticationError:
+                logger.warning('Rejected connection of unauthenticated agent')
+            except (IOError, EOFError, OSError):
+                # The listener was closed
+                return
+
+    def _handle(self, conn, msg):
+        """Handle a message received from an agent"""
+        if msg[0] == 'setup':
+            # Workers request the setup function on a dedicated connection
+            # and close it once they receive it
+            del self.assigned[conn]
+            del self.last_seen[conn]
+            try:
+                conn.send(('setup', self.setup))
+            finally:
+                conn.close()
+        elif msg[0] == 'result':
+            _, job_id, result = msg
+            self.assigned[conn] = None
+            callback = self.callbacks.pop(job_id, None)
+            if callback is not None:
+                callback(result)
+            self._assign(conn)
+        elif msg[0] == 'ready':
+            self._assign(conn)
+
+    def _assign(self, conn):
+        """Send the next job to an idle agent, if any is queued. Agents
+        remain idle if all queued jobs are assigned, as jobs may be queued
+        again if another agent dies"""
+        if self.jobs:
+            job = self.jobs.popleft()
+            self.assigned[conn] = job
+            try:
+                conn.send(('job',) + job)
+            except (IOError, EOFError):
+                self._drop(conn, 'Agent disconnected')
+
+    def _drop(self, conn, reason):
+        """Close the connection with an agent and queue again its job"""
+        job = self.assigned.pop(conn, None)
+        self.last_seen.pop(conn, None)
+        conn.close()
+        if job is not None:
+            logger.warning('%s. Queuing again job %d', reason, job[0])
+            self.jobs.appendleft(job)
+        else:
+            logger.info('%s', reason)
+        # Assign queued jobs to idle agents
+        for idle in [c for c, j in self.assigned.items() if j is None]:
+            if not self.jobs:
+                break
+            self._assign(idle)
+
+
+def _agent(address, authkey, heartbeat_interval):
+    """Connect to a coordinator and execute jobs until stopped"""
+    conn = Client(address, authkey=authkey)
+    lock = threading.Lock()
+    stopped = threading.Event()
+
+    def send(msg):
+        with lock:
+            conn.send(msg)
+
+    def heartbeat():
+        while not stopped.wait(heartbeat_interval):
+            try:
+                send(('heartbeat',))
+            except (IOError, EOFError):
+                return
+
+    heartbeat_thread = threading.Thread(target=heartbeat)
+    heartbeat_thread.daemon = True
+    heartbeat_thread.start()
+    try:
+        send(('ready',))
+        while True:
+            try:
+                msg = conn.recv()
+            except (IOError, EOFError):
+                logger.warning('Lost connection with coordinator')
+                return
+            if msg[0] == 'stop':
+                return
+            _, job_id, func, args = msg
+            try:
+                result = func(*args)
+            except Exception:
+                logger.error('Job %d failed\n%s', job_id, traceback.format_exc())
+                result = None
+            send(('result', job_id, result))
+    finally:
+        stopped.set()
+        conn.close()
+
+
+def run_worker(address, authkey, n_agents=1, heartbeat_interval=5):
+    """Run a worker executing jobs served by a coordinator.
+
+    The worker executes the setup function of the coordinator and then forks
+    the requested number of agents, so that they inherit the state created by
+    the setup function. This call is blocking and returns once all agents are
+    stopped by the coordinator.
+
+    Parameters
+    ----------
+    address : tuple or str
+        The (host, port) address of the TCP socket or the path of the Unix
+        socket of the coordinator
+    authkey : str
+        The key used to authenticate with the coordinator
+    n_agents : int, optional
+        The number of agents, i.e. the number of jobs executed in parallel
+    heartbeat_interval : float, optional
+        The interval (in seconds) between heartbeats sent by agents to the
+        coordinator. It must be shorter than the heartbeat timeout of the
+        coordinator
+    """
+    conn = Client(address, authkey=authkey)
+    conn.send(('setup',))
+    _, setup = conn.recv()
+    conn.close()
+    if setup is not None:
+        func, args = setup
+        func(*args)
+    logger.info('Starting %d agent(s) connected to %s', n_agents, str(address))
+    agents = [mp.Process(target=_agent, args=(address, authkey, heartbeat_interval))
+              for _ in range(n_agents)]
+    for agent in agents:
+        agent.start()
+    for agent in agents:
+        agent.join()
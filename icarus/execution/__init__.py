@@ -3,4 +3,5 @@
 """
 from .network import *
 from .collectors import *
+from .telemetry import *
 from .engine import *
@@ -335,7 +335,10 @@ class LatencyCollector(DataCollector):
 
     @inheritdoc(DataCollector)
     def replacement_interval_over(self, replacement_interval, timestamp):
-        self.satrate_times[timestamp] = self.n_satisfied_interval/self.interval_sess_count
+        # Replacement intervals are also notified during the warm-up, when no
+        # session is logged
+        if self.sess_count == 0:
+            return
         self.satrate_times[timestamp] = self.n_satisfied/self.sess_count
 
         self.interval_sess_count = 0
@@ -6,14 +6,41 @@ experiments needs to be run, instantiates all the required classes and executes
 the experiment by iterating through the event provided by an event generator
 and providing them to a strategy instance.
 """
-from icarus.execution import NetworkModel, NetworkView, NetworkController, CollectorProxy
+import os
+import time
+import gzip
+import random
+import signal
+import logging
+import traceback
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import numpy as np
+import networkx as nx
+import resource
+
+from icarus.execution import NetworkModel, NetworkView, NetworkController, CollectorProxy, \
+                             Telemetry
+from icarus.execution.network import symmetrify_paths
 from icarus.registry import DATA_COLLECTOR, STRATEGY
+from icarus.util import Tree
+
 
+__all__ = [
+    'exec_experiment',
+    'exec_experiment_group',
+    'resume_experiment'
+           ]
 
-__all__ = ['exec_experiment']
 
+logger = logging.getLogger('engine')
 
-def exec_experiment(topology, workload, netconf, strategy, cache_policy, collectors, warmup_strategy):
+
+def exec_experiment(topology, workload, netconf, strategy, cache_policy, collectors, warmup_strategy,
+                    checkpoint=None, checkpoint_interval=None, telemetry=None):
     """Execute the simulation of a specific scenario.
 
     Parameters
@@ -38,13 +65,29 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
         The collectors to be used. It is a dictionary in which keys are the
         names of collectors to use and values are dictionaries of attributes
         for the collector they refer to.
+    checkpoint : str, optional
+        Path of the file where the state of the experiment is periodically
+        saved. The experiment can be resumed from this file with
+        `resume_experiment`. Checkpointing requires a resumable workload
+    checkpoint_interval : float, optional
+        Minimum wall-clock time (in seconds) between two checkpoints
+    telemetry : Telemetry, optional
+        The telemetry recording performance metrics of the experiment. If not
+        specified, metrics are recorded from the start of this call
 
     Returns
     -------
     results : Tree
-        A tree with the aggregated simulation results from all collectors
+        A tree with the aggregated simulation results from all collectors and
+        the performance metrics of the experiment under the *PERF* key. If
+        the workload detects the end of the warm-up automatically, the tree
+        also reports the number of warm-up requests under the *WARMUP* key
     """
-    model = NetworkModel(topology, cache_policy, workload.n_services, workload.rate, **netconf)
+    if telemetry is None:
+        telemetry = Telemetry()
+    netconf = _compute_paths(topology, netconf, telemetry)
+    with telemetry.phase('MODEL'):
+        model = NetworkModel(topology, cache_policy, workload.n_services, workload.rate, **netconf)
     workload.model = model
     view = NetworkView(model)
     controller = NetworkController(model)
@@ -53,6 +96,9 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
                        for name, params in collectors.items()]
     collector = CollectorProxy(view, collectors_inst)
     controller.attach_collector(collector)
+    warmup_detector = getattr(workload, 'warmup_detector', None)
+    if warmup_detector is not None:
+        controller.attach_warmup_detector(warmup_detector)
 
     strategy_name = strategy['name']
     warmup_strategy_name = warmup_strategy['name']
@@ -61,11 +107,273 @@ def exec_experiment(topology, workload, netconf, strategy, cache_policy, collect
     strategy_inst = STRATEGY[strategy_name](view, controller, **strategy_args)
     warmup_strategy_inst = STRATEGY[warmup_strategy_name](view, controller, **warmup_strategy_args)
 
-    for time, event in workload:
-        #continue
-        strategy_inst.process_event(time, **event)
+    return _run(workload, strategy_inst, collector, telemetry, checkpoint, checkpoint_interval)
 
-    return collector.results()
+
+def _compute_paths(topology, netconf, telemetry):
+    """Return the network configuration including the shortest paths of the
+    topology, computing them if not provided, so that the time spent
+    computing them is recorded separately from the model construction"""
+    if 'shortest_path' in netconf and netconf['shortest_path'] is not None:
+        return netconf
+    with telemetry.phase('APSP'):
+        netconf = dict(netconf)
+        netconf['shortest_path'] = symmetrify_paths(nx.all_pairs_dijkstra_path(topology))
+    return netconf
+
+
+def resume_experiment(checkpoint, checkpoint_interval=None, telemetry=None):
+    """Resume the execution of an experiment from a checkpoint.
+
+    Parameters
+    ----------
+    checkpoint : str
+        Path of the checkpoint file, written by `exec_experiment`. New
+        checkpoints are written to the same file
+    checkpoint_interval : float, optional
+        Minimum wall-clock time (in seconds) between two checkpoints
+    telemetry : Telemetry, optional
+        The telemetry recording performance metrics of the experiment
+
+    Returns
+    -------
+    results : Tree
+        A tree with the aggregated simulation results from all collectors.
+        Performance metrics only cover the execution after resuming
+    """
+    if telemetry is None:
+        telemetry = Telemetry()
+    with gzip.open(checkpoint, 'rb') as f:
+        workload, strategy_inst, collector, py_rng, np_rng = pickle.load(f)
+    random.setstate(py_rng)
+    np.random.set_state(np_rng)
+    return _run(workload, strategy_inst, collector, telemetry, checkpoint, checkpoint_interval)
+
+
+def _run(workload, strategy_inst, collector, telemetry, checkpoint=None,
+         checkpoint_interval=None):
+    """Feed all events of the workload to the strategy and return the results
+    of the experiment, checkpointing its state periodically if required
+    """
+    if checkpoint is not None and not getattr(workload, 'resumable', False):
+        logger.warning('Workload %s cannot be resumed. Checkpointing disabled',
+                       type(workload).__name__)
+        checkpoint = None
+    last_checkpoint = time.time()
+    with telemetry.phase('EVENT_LOOP'), telemetry.profiling():
+        for timestamp, event in _monitor(workload, telemetry):
+            strategy_inst.process_event(timestamp, **event)
+            # Check the wall clock only every few events to keep overhead low
+            if checkpoint is not None and telemetry.n_events % 1000 == 0 \
+                    and time.time() - last_checkpoint >= checkpoint_interval:
+                _write_checkpoint(checkpoint, workload, strategy_inst, collector)
+                last_checkpoint = time.time()
+    return _collect_results(workload, collector, telemetry)
+
+
+def _monitor(events, telemetry, workload=None):
+    """Iterate over events, counting them and tracking the maximum length of
+    the event queue of the network model of the workload, if any"""
+    workload = events if workload is None else workload
+    event_queue = getattr(getattr(workload, 'model', None), 'eventQ', ())
+    for item in events:
+        # The event queue only grows while the previous event is processed,
+        # so its length is checked before yielding the next one
+        if len(event_queue) > telemetry.event_queue_peak:
+            telemetry.event_queue_peak = len(event_queue)
+        telemetry.n_events += 1
+        yield item
+
+
+def _write_checkpoint(path, workload, strategy_inst, collector):
+    """Save the state of an in-flight experiment to a compressed file.
+
+    The workload object references the network model (and hence caches,
+    computational spots and the event queue) while the strategy references
+    the network view and the controller with its open sessions. All objects
+    are pickled together so that shared references are preserved. The state
+    of the random number generators is saved as well.
+
+    The file is written atomically, so that an interruption while writing
+    does not corrupt the previous checkpoint.
+    """
+    tmp_path = path + '.tmp'
+    with gzip.open(tmp_path, 'wb', compresslevel=1) as f:
+        pickle.dump((workload, strategy_inst, collector,
+                     random.getstate(), np.random.get_state()),
+                    f, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmp_path, path)
+    logger.debug('Saved checkpoint to %s', path)
+
+
+def exec_experiment_group(topology, workload, netconf, strategies, cache_policy,
+                          collectors, warmup_strategy, telemetry=None):
+    """Execute the simulation of a group of experiments sharing the same
+    scenario and differing only in the strategy used.
+
+    The warm-up phase (i.e. all events preceding the first logged event) is
+    executed only once using the warm-up strategy. The warm state of the
+    simulation (caches, computational spots, event queue, workload generator
+    and random number generators) is then forked, using copy-on-write process
+    forking, into a measurement phase for each strategy. This ensures that all
+    strategies are compared starting from an identical warm state.
+
+    Parameters
+    ----------
+    topology : Topology
+        The FNSS Topology object modelling the network topology on which
+        experiments are run.
+    workload : iterable
+        An iterable object whose elements are (time, event) tuples
+    netconf : dict
+        Dictionary of attributes to inizialize the network model
+    strategies : list of tree
+        Strategy definitions, one per measurement phase
+    cache_policy : tree
+        Cache policy definition
+    collectors: dict
+        The collectors to be used, keyed by name
+    warmup_strategy : tree
+        Definition of the strategy used during the warm-up phase
+    telemetry : Telemetry, optional
+        The telemetry recording performance metrics of the experiments. If
+        not specified, metrics are recorded from the start of this call
+
+    Returns
+    -------
+    results : list of Tree
+        The results of each measurement phase, in the same order of the
+        strategies. If a measurement phase fails, its results are *None*.
+        Performance metrics of each experiment include the shared warm-up
+
+    Notes
+    -----
+    This function requires the os.fork system call and therefore runs only on
+    POSIX systems.
+    """
+    if telemetry is None:
+        telemetry = Telemetry()
+    netconf = _compute_paths(topology, netconf, telemetry)
+    with telemetry.phase('MODEL'):
+        model = NetworkModel(topology, cache_policy, workload.n_services, workload.rate, **netconf)
+    workload.model = model
+    view = NetworkView(model)
+    controller = NetworkController(model)
+
+    collectors_inst = [DATA_COLLECTOR[name](view, **params)
+                       for name, params in collectors.items()]
+    collector = CollectorProxy(view, collectors_inst)
+    controller.attach_collector(collector)
+    warmup_detector = getattr(workload, 'warmup_detector', None)
+    if warmup_detector is not None:
+        controller.attach_warmup_detector(warmup_detector)
+
+    warmup_strategy_args = {k: v for k, v in warmup_strategy.items() if k != 'name'}
+    warmup_strategy_inst = STRATEGY[warmup_strategy['name']](view, controller, **warmup_strategy_args)
+
+    events = _monitor(iter(workload), telemetry, workload)
+    first_event = None
+    with telemetry.phase('EVENT_LOOP'), telemetry.profiling():
+        for timestamp, event in events:
+            if event['log']:
+                first_event = (timestamp, event)
+                break
+            warmup_strategy_inst.process_event(timestamp, **event)
+
+    def measure(strategy, cpu_at_fork):
+        telemetry.forked(cpu_at_fork)
+        strategy_args = {k: v for k, v in strategy.items() if k != 'name'}
+        strategy_inst = STRATEGY[strategy['name']](view, controller, **strategy_args)
+        with telemetry.phase('EVENT_LOOP'), telemetry.profiling():
+            if first_event is not None:
+                timestamp, event = first_event
+                strategy_inst.process_event(timestamp, **event)
+            for timestamp, event in events:
+                strategy_inst.process_event(timestamp, **event)
+        return _collect_results(workload, collector, telemetry)
+
+    results = []
+    for strategy in strategies:
+        try:
+            usage = resource.getrusage(resource.RUSAGE_SELF)
+            results.append(_fork_call(measure, strategy,
+                                      (usage.ru_utime, usage.ru_stime)))
+        except RuntimeError as e:
+            logger.error('Measurement phase with strategy %s failed\n%s',
+                         strategy['name'], str(e))
+            results.append(None)
+    return results
+
+
+def _collect_results(workload, collector, telemetry):
+    """Return the results of all collectors of an experiment, including the
+    warm-up summary if the end of the warm-up is detected automatically and
+    the performance metrics of the experiment
+    """
+    with telemetry.phase('COLLECTORS'):
+        results = collector.results()
+    warmup_detector = getattr(workload, 'warmup_detector', None)
+    if warmup_detector is not None:
+        results['WARMUP'] = Tree({'N_REQUESTS': workload.warmup_end,
+                                  'DETECTED': warmup_detector.warmed_up,
+                                  'TRUNCATION_POINT': warmup_detector.truncation_point})
+    results['PERF'] = telemetry.results()
+    return results
+
+
+def _fork_call(func, *args):
+    """Call a function in a forked child process and return its result.
+
+    The child process inherits a copy-on-write image of the state of the
+    calling process, hence any side effect of the function call is not
+    visible to the caller. The returned value must be picklable.
+
+    Parameters
+    ----------
+    func : callable
+        The function to call
+    *args : arguments
+        Arguments to pass to the function
+
+    Returns
+    -------
+    ret : any type
+        The value returned by the function
+
+    Raises
+    ------
+    RuntimeError
+        If the function raised an exception in the child process. The message
+        of the error contains the traceback of the child
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child process: signal handlers of the parent (e.g. those writing
+        # partial results on termination) must not be executed by the child
+        os.close(read_fd)
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT):
+            signal.signal(sig, signal.SIG_DFL)
+        try:
+            out = pickle.dumps((True, func(*args)), pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            out = pickle.dumps((False, traceback.format_exc()), pickle.HIGHEST_PROTOCOL)
+        with os.fdopen(write_fd, 'wb') as f:
+            f.write(out)
+        os._exit(0)
+    os.close(write_fd)
+    # Read the whole output before waiting for the child to avoid deadlocks
+    # when the output does not fit in the pipe buffer
+    with os.fdopen(read_fd, 'rb') as f:
+        data = f.read()
+    _, status = os.waitpid(pid, 0)
+    if not data:
+        raise RuntimeError('Child process terminated with status %d without '
+                           'returning any result' % status)
+    success, ret = pickle.loads(data)
+    if not success:
+        raise RuntimeError(ret)
+    return ret
 
     """
     counter = 0
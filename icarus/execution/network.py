@@ -15,7 +15,9 @@ of all relevant events.
 """
 import random
 import logging
+import array
 
+import numpy as np
 import networkx as nx
 import fnss
 
@@ -28,6 +30,7 @@ from icarus.models.service.compSpot import ComputationalSpot
 __all__ = [
     'Service',
     'Event',
+    'PathTable',
     'NetworkModel',
     'NetworkView',
     'NetworkController'
@@ -98,6 +101,123 @@ def symmetrify_paths(shortest_paths):
     return shortest_paths
 
 
+class PathTable(dict):
+    """Read-only table of all-pairs shortest paths.
+
+    The paths are stored in two numpy arrays: a flat array with the indices of
+    the nodes of all paths and an array with the offset of each path in it.
+    Compared to a dict of dicts of lists, this takes a fraction of the memory
+    and, since numpy buffers are not touched by reference counting, a table
+    built before forking worker processes is shared by all of them instead of
+    being copied.
+
+    A table can be used in place of a dict of dicts of paths, i.e. the path
+    from *s* to *t* is `table[s][t]`. Paths are decoded from the arrays the
+    first time they are accessed and then kept, so that only the paths
+    actually used by a process are stored as lists.
+    """
+
+    def __init__(self, shortest_paths):
+        """Constructor
+
+        Parameters
+        ----------
+        shortest_paths : dict of dict
+            All pairs shortest paths
+        """
+        super(PathTable, self).__init__()
+        self._nodes = list(shortest_paths)
+        self._index = {v: i for i, v in enumerate(self._nodes)}
+        n = len(self._nodes)
+        self._offsets = np.zeros(n * n + 1, dtype=np.int64)
+        hops = array.array('i')
+        for i, u in enumerate(self._nodes):
+            for j, v in enumerate(self._nodes):
+                path = shortest_paths[u].get(v, ())
+                hops.extend(self._index[w] for w in path)
+                self._offsets[i * n + j + 1] = len(hops)
+        self._hops = np.frombuffer(hops, dtype=np.int32).copy()
+
+    def path(self, s, t):
+        """Return the shortest path from *s* to *t*
+
+        Parameters
+        ----------
+        s : any hashable type
+            Origin node
+        t : any hashable type
+            Destination node
+
+        Returns
+        -------
+        path : list
+            List of nodes of the path, including *s* and *t*
+        """
+        k = self._index[s] * len(self._nodes) + self._index[t]
+        start, end = self._offsets[k], self._offsets[k + 1]
+        if start == end:
+            raise KeyError(t)
+        nodes = self._nodes
+        return [nodes[i] for i in self._hops[start:end].tolist()]
+
+    def __missing__(self, s):
+        if s not in self._index:
+            raise KeyError(s)
+        row = _PathTableRow(self, s)
+        self[s] = row
+        return row
+
+    def __contains__(self, s):
+        return s in self._index
+
+    def __iter__(self):
+        return iter(self._nodes)
+
+    def __len__(self):
+        return len(self._nodes)
+
+    def __reduce__(self):
+        # Decoded paths are not pickled
+        return (_rebuild_path_table, (self._nodes, self._offsets, self._hops))
+
+
+def _rebuild_path_table(nodes, offsets, hops):
+    """Rebuild a pickled PathTable"""
+    table = PathTable({})
+    table._nodes = nodes
+    table._index = {v: i for i, v in enumerate(nodes)}
+    table._offsets = offsets
+    table._hops = hops
+    return table
+
+
+class _PathTableRow(dict):
+    """Shortest paths from a node, as returned by `PathTable.__getitem__`"""
+
+    def __init__(self, table, s):
+        super(_PathTableRow, self).__init__()
+        self._table = table
+        self._s = s
+
+    def __missing__(self, t):
+        path = self._table.path(self._s, t)
+        self[t] = path
+        return path
+
+    def __contains__(self, t):
+        try:
+            self[t]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return (t for t in self._table if t in self)
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
 class NetworkView(object):
     """Network view
 
@@ -682,6 +802,7 @@ class NetworkController(object):
         self.session = {}
         self.model = model
         self.collector = None
+        self.warmup_detector = None
 
     def attach_collector(self, collector):
         """Attach a data collector to which all events will be reported.
@@ -697,6 +818,21 @@ class NetworkController(object):
         """Detach the data collector."""
         self.collector = None
 
+    def attach_warmup_detector(self, detector):
+        """Attach a warm-up detector which is notified of the outcome of all
+        sessions not logged.
+
+        Parameters
+        ----------
+        detector : MserWarmupDetector
+            The warm-up detector
+        """
+        self.warmup_detector = detector
+
+    def detach_warmup_detector(self):
+        """Detach the warm-up detector."""
+        self.warmup_detector = None
+
     def start_session(self, timestamp, receiver, content, log, flow_id=0, deadline=0):
         """Instruct the controller to start a new session (i.e. the retrieval
         of a content).
@@ -889,6 +1025,11 @@ class NetworkController(object):
         """
         if self.collector is not None and self.session[flow_id]['log']:
             self.collector.end_session(success, timestamp, flow_id)
+        if self.warmup_detector is not None and not self.session[flow_id]['log']:
+            # The warm-up detector observes whether unlogged sessions meet
+            # their deadline
+            sat = success and timestamp <= self.session[flow_id]['deadline']
+            self.warmup_detector.add(1.0 if sat else 0.0)
         self.session.pop(flow_id, None)
 
     def rewire_link(self, u, v, up, vp, recompute_paths=True):
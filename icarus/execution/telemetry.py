@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""Performance telemetry of the execution of experiments.
+
+The telemetry of an experiment is returned, together with its results, under
+the *PERF* key of the results tree, so that the throughput of the simulator
+can be tracked across experiments and versions.
+
+The event loop can also be profiled by a `SamplingProfiler`, which
+periodically interrupts the simulation and attributes the sample to the phase
+of the event processing being executed, e.g. processing an event in the
+strategy or dispatching data to collectors. Since the code being profiled is
+not instrumented, profiling has no overhead when disabled and a small
+overhead, proportional to the sampling frequency, when enabled.
+"""
+from __future__ import division
+import sys
+import time
+import signal
+import resource
+import contextlib
+import collections
+
+from icarus.util import Tree
+
+
+__all__ = [
+    'Telemetry',
+    'SamplingProfiler'
+           ]
+
+
+class Telemetry(object):
+    """Record performance metrics of the execution of an experiment.
+
+    The metrics recorded are the wall-clock time spent in each phase of the
+    experiment, the number of events processed and the throughput of the
+    event loop, the maximum number of events in the event queue, the CPU
+    time used by the process since the telemetry was created and the peak
+    resident set size of the process.
+    """
+
+    def __init__(self, profiler=None):
+        """Constructor
+
+        Parameters
+        ----------
+        profiler : SamplingProfiler, optional
+            The profiler of the event loop. If not specified, the event loop
+            is not profiled
+        """
+        self.profiler = profiler
+        self.phases = collections.OrderedDict()
+        self.n_events = 0
+        self.event_queue_peak = 0
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        self._cpu_base = (usage.ru_utime, usage.ru_stime)
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Context manager measuring the wall-clock time spent in a phase of
+        the experiment. Times of phases with the same name are summed.
+
+        Parameters
+        ----------
+        name : str
+            The name of the phase
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.time() - start
+
+    @contextlib.contextmanager
+    def profiling(self):
+        """Context manager profiling the code executed in it, if a profiler
+        is set"""
+        if self.profiler is None:
+            yield
+            return
+        self.profiler.start()
+        try:
+            yield
+        finally:
+            self.profiler.stop()
+
+    def forked(self, cpu_at_fork):
+        """Adjust CPU time counters after forking a child process, which
+        starts with no CPU time used, so that the CPU time reported by the
+        child includes the one used by the parent before forking.
+
+        Parameters
+        ----------
+        cpu_at_fork : tuple
+            The (user, sys) CPU time used by the parent process when forking
+        """
+        self._cpu_base = (self._cpu_base[0] - cpu_at_fork[0],
+                          self._cpu_base[1] - cpu_at_fork[1])
+
+    def results(self):
+        """Return the metrics recorded
+
+        Returns
+        -------
+        results : Tree
+            Tree of metrics. Times are expressed in seconds and memory in
+            bytes
+        """
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        loop_time = self.phases.get('EVENT_LOOP', 0)
+        # ru_maxrss is expressed in kilobytes on Linux and in bytes on OS X
+        peak_rss = usage.ru_maxrss if sys.platform == 'darwin' \
+                   else usage.ru_maxrss * 1024
+        results = Tree({
+            'N_EVENTS': self.n_events,
+            'EVENTS_PER_SECOND': self.n_events / loop_time if loop_time > 0 else 0,
+            'EVENT_QUEUE_PEAK': self.event_queue_peak,
+            'PEAK_RSS': peak_rss,
+            'CPU_USER': usage.ru_utime - self._cpu_base[0],
+            'CPU_SYS': usage.ru_stime - self._cpu_base[1],
+            'PHASES': dict(self.phases)})
+        if self.profiler is not None:
+            results['PROFILE'] = self.profiler.results()
+        return results
+
+
+class SamplingProfiler(object):
+    """Statistical profiler attributing the CPU time of the simulation to the
+    phases of event processing.
+
+    Every *interval* seconds of CPU time, the profiler receives a SIGPROF
+    signal and walks the stack of the code being executed, from the innermost
+    frame outwards, until it finds a frame matching one of the phases. The
+    sample is attributed to that phase, or to *OTHER* if no frame matches.
+    The innermost function being executed is recorded as well, to identify
+    hot functions.
+
+    Phases are described by (name, module, function) tuples. A frame matches
+    a phase if it executes a function with the given name in a module whose
+    name starts with the given one. Either the module or the function can be
+    *None*, to match any.
+
+    The profiler relies on POSIX interval timers and can only be used in the
+    main thread of a process. Timers are not inherited by forked processes,
+    so profiling must be started again in child processes.
+    """
+
+    # Phases of event processing, from the innermost to the outermost
+    PHASES = [
+        ('REPLACE_SERVICES', 'icarus.models.strategy', 'replace_services'),
+        ('COLLECTORS', 'icarus.execution.collectors', None),
+        ('PROCESS_EVENT', 'icarus.models.strategy', 'process_event'),
+        ('EVENT_POP', 'icarus.scenarios.workload', None),
+             ]
+
+    def __init__(self, interval=0.001, phases=None, n_functions=20):
+        """Constructor
+
+        Parameters
+        ----------
+        interval : float, optional
+            The CPU time (in seconds) between two samples
+        phases : list of tuples, optional
+            The (name, module, function) tuples describing each phase, from
+            the innermost to the outermost. If not specified, phases of the
+            simulation engine are used
+        n_functions : int, optional
+            The number of hottest functions reported
+        """
+        self.interval = interval
+        self.phases = phases if phases is not None else self.PHASES
+        self.n_functions = n_functions
+        self.phase_samples = collections.Counter()
+        self.function_samples = collections.Counter()
+        self._prev_handler = None
+
+    def _sample(self, signum, frame):
+        """Signal handler attributing a sample to a phase"""
+        if frame is None:
+            return
+        code = frame.f_code
+        self.function_samples['%s.%s' % (frame.f_globals.get('__name__'),
+                                         code.co_name)] += 1
+        phases = self.phases
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '')
+            function = frame.f_code.co_name
+            for name, phase_module, phase_function in phases:
+                if (phase_function is None or phase_function == function) and \
+                   (phase_module is None or module.startswith(phase_module)):
+                    self.phase_samples[name] += 1
+                    return
+            frame = frame.f_back
+        self.phase_samples['OTHER'] += 1
+
+    def start(self):
+        """Start sampling"""
+        self._prev_handler = signal.signal(signal.SIGPROF, self._sample)
+        # Restart system calls interrupted by samples instead of failing
+        signal.siginterrupt(signal.SIGPROF, False)
+        signal.setitimer(signal.ITIMER_PROF, self.interval, self.interval)
+
+    def stop(self):
+        """Stop sampling"""
+        signal.setitimer(signal.ITIMER_PROF, 0, 0)
+        signal.signal(signal.SIGPROF, self._prev_handler
+                      if self._prev_handler is not None else signal.SIG_DFL)
+
+    def results(self):
+        """Return the fraction of samples attributed to each phase and to
+        the hottest functions
+
+        Returns
+        -------
+        results : Tree
+            Tree with the number of samples (N_SAMPLES), the sampling
+            interval (INTERVAL), and the fraction of samples of each phase
+            (PHASES) and of the hottest functions (FUNCTIONS)
+        """
+        n_samples = sum(self.phase_samples.values())
+        fraction = lambda n: n / n_samples if n_samples > 0 else 0
+        return Tree({
+            'N_SAMPLES': n_samples,
+            'INTERVAL': self.interval,
+            'PHASES': {k: fraction(v) for k, v in self.phase_samples.items()},
+            'FUNCTIONS': {k: fraction(v) for k, v in
+                          self.function_samples.most_common(self.n_functions)}})
@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
 from __future__ import division
 import unittest
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 import networkx as nx
 import fnss
@@ -21,6 +25,34 @@ class TestSymmetrifyPaths(unittest.TestCase):
         network.symmetrify_paths(path)
         self.assertEqual(list(path[1][5]), list(reversed(path[5][1])))
 
+class TestPathTable(unittest.TestCase):
+
+    def setUp(self):
+        topology = fnss.Topology()
+        topology.add_path([1, 2, 4, 5, 3, 6, 1])
+        topology.add_node(7)
+        self.paths = network.symmetrify_paths(nx.all_pairs_shortest_path(topology))
+        self.table = network.PathTable(self.paths)
+
+    def test_paths(self):
+        for u in self.paths:
+            for v in self.paths[u]:
+                self.assertEqual(self.paths[u][v], self.table[u][v])
+
+    def test_unreachable(self):
+        self.assertRaises(KeyError, lambda: self.table[1][7])
+        self.assertRaises(KeyError, lambda: self.table[8])
+        self.assertNotIn(7, self.table[1])
+        self.assertIn(3, self.table[1])
+        self.assertEqual([7], list(self.table[7]))
+
+    def test_pickle(self):
+        self.table[1][5]
+        table = pickle.loads(pickle.dumps(self.table, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(self.paths[1][5], table[1][5])
+        self.assertEqual(self.paths[5][1], table[5][1])
+
+
 class TestNetworkMvc(unittest.TestCase):
 
     @classmethod
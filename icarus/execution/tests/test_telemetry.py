@@ -0,0 +1,67 @@
+import time
+import unittest
+
+from icarus.execution import Telemetry, SamplingProfiler
+
+
+class TestTelemetry(unittest.TestCase):
+
+    def test_phases(self):
+        telemetry = Telemetry()
+        with telemetry.phase('A'):
+            time.sleep(0.01)
+        with telemetry.phase('A'):
+            time.sleep(0.01)
+        with telemetry.phase('B'):
+            pass
+        results = telemetry.results()
+        self.assertGreaterEqual(results['PHASES']['A'], 0.02)
+        self.assertLess(results['PHASES']['B'], results['PHASES']['A'])
+
+    def test_events(self):
+        telemetry = Telemetry()
+        with telemetry.phase('EVENT_LOOP'):
+            for _ in range(1000):
+                telemetry.n_events += 1
+        results = telemetry.results()
+        self.assertEqual(1000, results['N_EVENTS'])
+        self.assertGreater(results['EVENTS_PER_SECOND'], 0)
+
+    def test_resources(self):
+        telemetry = Telemetry()
+        sum(range(100000))
+        results = telemetry.results()
+        self.assertGreaterEqual(results['CPU_USER'], 0)
+        self.assertGreaterEqual(results['CPU_SYS'], 0)
+        self.assertGreater(results['PEAK_RSS'], 0)
+
+    def test_forked(self):
+        telemetry = Telemetry()
+        cpu_user = telemetry.results()['CPU_USER']
+        telemetry.forked((1.0, 0.5))
+        self.assertAlmostEqual(cpu_user + 1.0, telemetry.results()['CPU_USER'], places=1)
+
+
+def _busy():
+    return sum(i * i for i in range(1000))
+
+
+class TestSamplingProfiler(unittest.TestCase):
+
+    def test_disabled(self):
+        telemetry = Telemetry()
+        with telemetry.profiling():
+            pass
+        self.assertNotIn('PROFILE', telemetry.results())
+
+    def test_phases(self):
+        profiler = SamplingProfiler(0.001, phases=[('BUSY', __name__, '_busy')])
+        telemetry = Telemetry(profiler)
+        with telemetry.profiling():
+            start = time.clock()
+            while time.clock() - start < 0.2:
+                _busy()
+        results = telemetry.results()['PROFILE']
+        self.assertGreater(results['N_SAMPLES'], 0)
+        self.assertAlmostEqual(1, sum(results['PHASES'].values()))
+        self.assertGreater(results['PHASES']['BUSY'], 0.5)
@@ -5,7 +5,9 @@ The orchestrator is responsible for scheduling experiments specified in the
 user-provided settings.
 """
 from __future__ import division
+import os
 import time
+import json
 import collections
 import multiprocessing as mp
 import logging
@@ -14,19 +16,37 @@ import sys
 import signal
 import traceback
 
-from icarus.execution import exec_experiment
+import networkx as nx
+
+from icarus.execution import exec_experiment, exec_experiment_group, resume_experiment, \
+                             PathTable, Telemetry, SamplingProfiler
+from icarus.execution.network import symmetrify_paths
 from icarus.registry import TOPOLOGY_FACTORY, COMPUTATION_PLACEMENT, CACHE_PLACEMENT, CONTENT_PLACEMENT, COMPUTATION_PLACEMENT, \
                             CACHE_POLICY, WORKLOAD, DATA_COLLECTOR, STRATEGY
-from icarus.results import ResultSet
-from icarus.util import SequenceNumber, timestr
+from icarus.results import ResultSet, ResultsJournal, ResultCache
+from icarus.distributed import Coordinator
+from icarus.util import SequenceNumber, Tree, timestr
 
 
-__all__ = ['Orchestrator', 'run_scenario']
+__all__ = [
+    'Orchestrator',
+    'CostModel',
+    'utilisation_report',
+    'prebuild_topologies',
+    'run_scenario',
+    'run_scenario_group'
+           ]
 
 
 logger = logging.getLogger('orchestration')
 
 
+# Topologies built before starting the experiments and their shortest paths,
+# keyed by the digest of the topology parameters. Worker processes forked
+# after they are built inherit them without copying the shortest paths
+_TOPOLOGIES = {}
+
+
 class Orchestrator(object):
     """Orchestrator.
 
@@ -34,7 +54,7 @@ class Orchestrator(object):
     aggregate results.
     """
 
-    def __init__(self, settings, summary_freq=4):
+    def __init__(self, settings, summary_freq=4, journal=None, resume=False):
         """Constructor
 
         Parameters
@@ -44,15 +64,62 @@ class Orchestrator(object):
         summary_freq : int
             Frequency (in number of experiment) at which summary messages
             are displayed
+        journal : str, optional
+            Path of the journal to which results of each experiment are
+            appended as soon as the experiment completes
+        resume : bool, optional
+            If *True*, results stored in the journal by a previous run of the
+            same campaign are loaded and experiments already completed are
+            not executed again
         """
         self.settings = settings
         self.results = ResultSet()
+        self.cost_model = CostModel(settings.STRATEGY_COST_FACTORS
+                                    if 'STRATEGY_COST_FACTORS' in settings
+                                    else None)
+        if 'COST_HISTORY' in settings and settings.COST_HISTORY \
+                and os.path.exists(settings.COST_HISTORY):
+            self.cost_model.load(settings.COST_HISTORY)
+        # Experiments scheduled and not completed yet, keyed by the digest of
+        # their parameters, and (start, end) wall-clock times of the jobs
+        # executed, used to estimate the remaining time and to report the
+        # utilisation of the processes
+        self.pending = collections.Counter()
+        self.experiments = {}
+        self.job_times = []
+        self.result_cache = ResultCache(settings.RESULT_CACHE) \
+                            if 'RESULT_CACHE' in settings and settings.RESULT_CACHE \
+                            else None
+        self.journal = None
+        if journal is not None:
+            self.journal = ResultsJournal(journal, resume)
+            if resume:
+                self.results = self.journal.read()
+        elif resume:
+            raise ValueError('Resuming a campaign requires a results journal')
         self.seq = SequenceNumber()
-        self.exp_durations = collections.deque(maxlen=30)
         self.n_success = 0
         self.n_fail = 0
         self.summary_freq = summary_freq
         self._stop = False
+        self.distributed = 'DISTRIBUTED_EXECUTION' in settings \
+                           and settings.DISTRIBUTED_EXECUTION
+        prebuild = 'PREBUILD_TOPOLOGIES' not in settings or settings.PREBUILD_TOPOLOGIES
+        if self.distributed:
+            # Topologies are prebuilt by each worker before starting its
+            # agents
+            self.coordinator = Coordinator(
+                    settings.COORDINATOR_ADDRESS,
+                    settings.COORDINATOR_AUTHKEY,
+                    setup=(prebuild_topologies, (settings.EXPERIMENT_QUEUE,))
+                          if prebuild else None,
+                    heartbeat_timeout=settings.HEARTBEAT_TIMEOUT
+                                      if 'HEARTBEAT_TIMEOUT' in settings else 30)
+            return
+        # Build topologies before creating the pool of processes, so that
+        # processes inherit them
+        if prebuild:
+            prebuild_topologies(settings.EXPERIMENT_QUEUE)
         if self.settings.PARALLEL_EXECUTION:
             self.pool = mp.Pool(settings.N_PROCESSES)
 
@@ -61,7 +128,9 @@ class Orchestrator(object):
         """
         logger.info('Orchestrator is stopping')
         self._stop = True
-        if self.settings.PARALLEL_EXECUTION:
+        if self.distributed:
+            self.coordinator.stop()
+        elif self.settings.PARALLEL_EXECUTION:
             self.pool.terminate()
             self.pool.join()
 
@@ -71,28 +140,99 @@ class Orchestrator(object):
         This call is blocking, whether multiple processes are used or not. This
         methods returns only after all experiments are executed.
         """
-        # Create queue of experiment configurations
-        queue = collections.deque(self.settings.EXPERIMENT_QUEUE)
+        # Create queue of experiment configurations. If experiments share the
+        # warm-up phase, each element of the queue is a group of experiments
+        # differing only in the strategy, otherwise a single experiment
+        shared_warmup = 'SHARED_WARMUP' in self.settings and self.settings.SHARED_WARMUP
+        if shared_warmup:
+            queue = collections.deque(group_by_scenario(self.settings.EXPERIMENT_QUEUE))
+        else:
+            queue = collections.deque([experiment] for experiment
+                                      in self.settings.EXPERIMENT_QUEUE)
+        # Number of replications of each experiment already completed, i.e.
+        # found in the results loaded from the journal
+        n_done = collections.Counter(Tree(params).digest()
+                                     for params, _ in self.results)
         # Calculate number of experiments and number of processes
-        self.n_exp = len(queue) * self.settings.N_REPLICATIONS
+        self.n_exp = len(self.settings.EXPERIMENT_QUEUE) * self.settings.N_REPLICATIONS
         self.n_proc = self.settings.N_PROCESSES \
                       if self.settings.PARALLEL_EXECUTION \
                       else 1
-        logger.info('Starting simulations: %d experiments, %d process(es)'
-                    % (self.n_exp, self.n_proc))
+        if self.results:
+            logger.info('Resuming simulations: %d experiments already completed',
+                        len(self.results))
+            self.n_success = len(self.results)
+        # Take results of experiments executed by previous campaigns from the
+        # cache, if any
+        if self.result_cache is not None:
+            n_cached = 0
+            for params in self.settings.EXPERIMENT_QUEUE:
+                digest = Tree(params).digest()
+                cached = self.result_cache.get(params, self.settings.DATA_COLLECTORS)
+                for results in cached[n_done[digest]:self.settings.N_REPLICATIONS]:
+                    self._store(params, results)
+                    n_done[digest] += 1
+                    n_cached += 1
+            self.n_success += n_cached
+            logger.info('Found results of %d experiments in cache', n_cached)
+        if self.distributed:
+            logger.info('Starting simulations: %d experiments, distributed execution'
+                        % self.n_exp)
+        else:
+            logger.info('Starting simulations: %d experiments, %d process(es)'
+                        % (self.n_exp, self.n_proc))
+
+        # Build the list of jobs to execute. Each job is an
+        # (experiments, seqs) tuple, where experiments is a group of
+        # experiments sharing the warm-up or a single experiment
+        jobs = []
+        while queue:
+            jobs.extend(self._pending(queue.popleft(), n_done))
+        for experiments, _ in jobs:
+            for params in experiments:
+                digest = Tree(params).digest()
+                self.pending[digest] += 1
+                self.experiments[digest] = params
+        if self.settings.PARALLEL_EXECUTION or self.distributed:
+            # Dispatch the most expensive jobs first, so that the cheapest
+            # ones fill the gaps left at the end of the campaign. Jobs are
+            # queued one by one, so each process picks the next most
+            # expensive job as soon as it becomes idle
+            jobs.sort(key=lambda job: sum(self.cost_model.cost(params)
+                                          for params in job[0]), reverse=True)
+        if self.distributed:
+            for experiments, seqs in jobs:
+                if shared_warmup:
+                    self.coordinator.submit(run_scenario_group,
+                            (self.settings, experiments, seqs, self.n_exp),
+                            self.experiment_group_callback)
+                else:
+                    self.coordinator.submit(run_scenario,
+                            (self.settings, experiments[0], seqs[0], self.n_exp),
+                            self.experiment_callback)
+            try:
+                self.coordinator.run()
+            except KeyboardInterrupt:
+                self.coordinator.stop()
+            # Utilisation is reported with respect to the maximum number of
+            # agents connected at the same time
+            self.n_proc = max(self.coordinator.max_agents, 1)
 
-        if self.settings.PARALLEL_EXECUTION:
+        elif self.settings.PARALLEL_EXECUTION:
             # This job queue is used only to keep track of which jobs have
             # finished and which are still running. Currently this information
             # is used only to handle keyboard interrupts correctly
             job_queue = collections.deque()
-            # Schedule experiments from the queue
-            while queue:
-                experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
+            for experiments, seqs in jobs:
+                if shared_warmup:
+                    job_queue.append(self.pool.apply_async(run_scenario_group,
+                            args=(self.settings, experiments, seqs,
+                                  self.n_exp),
+                            callback=self.experiment_group_callback))
+                else:
                     job_queue.append(self.pool.apply_async(run_scenario,
-                            args=(self.settings, experiment,
-                                  self.seq.assign(), self.n_exp),
+                            args=(self.settings, experiments[0],
+                                  seqs[0], self.n_exp),
                             callback=self.experiment_callback))
             self.pool.close()
             # This solution is probably not optimal, but at least makes
@@ -112,26 +252,98 @@ class Orchestrator(object):
             self.pool.join()
 
         else:  # Single-process execution
-            while queue:
-                experiment = queue.popleft()
-                for _ in range(self.settings.N_REPLICATIONS):
+            for experiments, seqs in jobs:
+                if shared_warmup:
+                    self.experiment_group_callback(run_scenario_group(
+                                        self.settings, experiments, seqs,
+                                        self.n_exp))
+                else:
                     self.experiment_callback(run_scenario(self.settings,
-                                            experiment, self.seq.assign(),
+                                            experiments[0], seqs[0],
                                             self.n_exp))
-                    if self._stop:
-                        self.stop()
+                if self._stop:
+                    self.stop()
 
         logger.info('END | Planned: %d, Completed: %d, Succeeded: %d, Failed: %d',
                     self.n_exp, self.n_fail + self.n_success, self.n_success, self.n_fail)
+        if self.job_times:
+            report = utilisation_report(self.job_times, self.n_proc)
+            logger.info('SCHEDULE | Makespan: %s, Utilisation: %.1f%%, '
+                        'Tail: %s at %.1f%% utilisation',
+                        timestr(report['makespan'], True),
+                        100 * report['utilisation'],
+                        timestr(report['tail'], True),
+                        100 * report['tail_utilisation'])
+        if 'COST_HISTORY' in self.settings and self.settings.COST_HISTORY:
+            self.cost_model.save(self.settings.COST_HISTORY)
+        if self.journal is not None:
+            self.journal.close()
+
+    def _pending(self, group, n_done):
+        """Return the replications of a group of experiments which still
+        have to be executed.
+
+        Sequence numbers are assigned to skipped replications too, so that
+        each experiment keeps the same sequence number across resumed runs.
+
+        Parameters
+        ----------
+        group : list of Tree
+            The experiments of the group
+        n_done : Counter
+            Number of completed replications of each experiment, keyed by the
+            digest of its parameters
+
+        Returns
+        -------
+        pending : list of tuples
+            For each replication with at least one experiment to execute, a
+            (experiments, seqs) 2-tuple with the experiments to execute and
+            their sequence numbers
+        """
+        pending = []
+        digests = [Tree(experiment).digest() for experiment in group]
+        for i in range(self.settings.N_REPLICATIONS):
+            seqs = [self.seq.assign() for _ in group]
+            todo = [j for j, digest in enumerate(digests) if n_done[digest] <= i]
+            if todo:
+                pending.append(([group[j] for j in todo], [seqs[j] for j in todo]))
+        return pending
+
+
+    def _store(self, params, results):
+        """Add the results of an experiment to the result set and to the
+        journal"""
+        self.results.add(params, results)
+        if self.journal is not None:
+            self.journal.append(params, results)
 
+    def experiment_group_callback(self, args):
+        """Callback method called by run_scenario_group
 
-    def experiment_callback(self, args):
+        Parameters
+        ----------
+        args : list
+            List of values returned by each experiment of the group, with the
+            same format of the arguments of experiment_callback
+        """
+        for arg in args:
+            self.experiment_callback(arg, log_job=False)
+        durations = [arg[2] for arg in args if arg]
+        if durations:
+            end = time.time()
+            self.job_times.append((end - sum(durations), end))
+
+    def experiment_callback(self, args, log_job=True):
         """Callback method called by run_scenario
 
         Parameters
         ----------
         args : tuple
             Tuple of arguments
+        log_job : bool, optional
+            If *True*, the experiment is recorded as a job for the purpose
+            of reporting the utilisation of the processes
         """
         # If args is None, that means that an exception was raised during the
         # execution of the experiment. In such case, ignore it
@@ -142,20 +354,461 @@ class Orchestrator(object):
         params, results, duration = args
         self.n_success += 1
         # Store results
-        self.results.add(params, results)
-        self.exp_durations.append(duration)
+        self._store(params, results)
+        if self.result_cache is not None:
+            self.result_cache.put(params, self.settings.DATA_COLLECTORS, results)
+        self.cost_model.observe(params, duration)
+        self.pending[Tree(params).digest()] -= 1
+        if log_job:
+            end = time.time()
+            self.job_times.append((end - duration, end))
         if self.n_success % self.summary_freq == 0:
             # Number of experiments scheduled to be executed
             n_scheduled = self.n_exp - (self.n_fail + self.n_success)
-            # Compute ETA
-            n_cores = min(mp.cpu_count(), self.n_proc)
-            mean_duration = sum(self.exp_durations) / len(self.exp_durations)
-            eta = timestr(n_scheduled * mean_duration / n_cores, False)
+            # Compute ETA from the estimated cost of the pending experiments.
+            # Experiments which failed are not known here and are therefore
+            # still counted as pending
+            if self.distributed:
+                n_cores = max(self.coordinator.n_agents, 1)
+            else:
+                n_cores = min(mp.cpu_count(), self.n_proc)
+            eta = timestr(sum(self.cost_model.cost(self.experiments[digest]) * n
+                              for digest, n in self.pending.items() if n > 0)
+                          / n_cores, False)
             # Print summary
             logger.info('SUMMARY | Completed: %d, Failed: %d, Scheduled: %d, ETA: %s',
                         self.n_success, self.n_fail, n_scheduled, eta)
 
 
+class CostModel(object):
+    """Model of the wall-clock duration of experiments, used to schedule
+    experiments and to estimate the remaining time of a campaign.
+
+    The work required by an experiment is estimated as the product of the
+    number of requests, the number of nodes of the topology and a factor
+    depending on the strategy. Work is converted to time using the rate
+    (seconds per unit of work) observed for experiments of the same strategy,
+    or for all experiments if none of the same strategy was observed.
+    Experiments whose duration was observed, in this or previous runs, are
+    instead expected to last as much as their mean observed duration.
+    """
+
+    def __init__(self, strategy_factors=None):
+        """Constructor
+
+        Parameters
+        ----------
+        strategy_factors : dict, optional
+            Relative cost of each strategy, keyed by strategy name. Strategies
+            not listed have a factor of 1
+        """
+        self.strategy_factors = strategy_factors if strategy_factors else {}
+        # Observed experiments, keyed by the digest of their parameters. Each
+        # value is a dict with the strategy name, the work and the list of
+        # observed durations of the experiment
+        self.history = {}
+        self.max_durations = 10
+        self._n_nodes = {}
+
+    def _topology_size(self, topology):
+        """Return the number of nodes of a topology, building it only the
+        first time a topology with the same parameters is requested"""
+        spec = Tree(topology)
+        key = spec.digest()
+        if key in _TOPOLOGIES:
+            return _TOPOLOGIES[key][0].number_of_nodes()
+        if key not in self._n_nodes:
+            name = spec.pop('name', None)
+            try:
+                self._n_nodes[key] = TOPOLOGY_FACTORY[name](**spec).number_of_nodes()
+            except Exception:
+                # Invalid topologies are reported when experiments are run
+                self._n_nodes[key] = 1
+        return self._n_nodes[key]
+
+    def work(self, params):
+        """Return the work required by an experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+
+        Returns
+        -------
+        work : float
+            The work required by the experiment
+        """
+        workload = params['workload'] if 'workload' in params else {}
+        n_requests = sum(workload[k] for k in ('n_warmup', 'n_measured')
+                         if k in workload)
+        n_nodes = self._topology_size(params['topology']) \
+                  if 'topology' in params else 1
+        strategy = params['strategy']['name'] if 'strategy' in params else None
+        return max(n_requests, 1) * n_nodes * self.strategy_factors.get(strategy, 1)
+
+    def _rate(self, strategy):
+        """Return the observed duration per unit of work of experiments of
+        a strategy or, if none was observed, of all experiments"""
+        for records in ([r for r in self.history.values()
+                         if r['strategy'] == strategy],
+                        list(self.history.values())):
+            work = sum(r['work'] * len(r['durations']) for r in records)
+            if work > 0:
+                return sum(sum(r['durations']) for r in records) / work
+        return 1
+
+    def cost(self, params):
+        """Return the expected duration of an experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+
+        Returns
+        -------
+        cost : float
+            The expected duration in seconds. If no experiment was observed
+            yet, the cost is expressed in units of work
+        """
+        digest = Tree(params).digest()
+        if digest in self.history:
+            durations = self.history[digest]['durations']
+            return sum(durations) / len(durations)
+        strategy = params['strategy']['name'] if 'strategy' in params else None
+        return self.work(params) * self._rate(strategy)
+
+    def observe(self, params, duration):
+        """Record the observed duration of an experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+        duration : float
+            The wall-clock duration of the experiment in seconds
+        """
+        digest = Tree(params).digest()
+        if digest not in self.history:
+            self.history[digest] = {
+                'strategy': params['strategy']['name'] if 'strategy' in params else None,
+                'work': self.work(params),
+                'durations': []}
+        durations = self.history[digest]['durations']
+        durations.append(duration)
+        # Only keep the most recent durations, so that the history does not
+        # grow indefinitely and follows changes of the code
+        del durations[:-self.max_durations]
+
+    def load(self, path):
+        """Load durations observed in previous runs from a file
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        """
+        with open(path) as f:
+            self.history.update(json.load(f))
+
+    def save(self, path):
+        """Save observed durations to a file
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        """
+        with open(path, 'w') as f:
+            json.dump(self.history, f)
+
+
+def utilisation_report(job_times, n_proc):
+    """Compute how well the processes were utilised during a campaign.
+
+    The tail of the campaign is the interval between the start of the last
+    job, after which there are no more jobs to dispatch to idle processes,
+    and the end of the campaign.
+
+    Parameters
+    ----------
+    job_times : list of tuples
+        The (start, end) wall-clock times of each job
+    n_proc : int
+        The number of processes executing jobs
+
+    Returns
+    -------
+    report : dict
+        A dictionary with the makespan and the duration of the tail of the
+        campaign (in seconds) and the fraction of process time used overall
+        (utilisation) and during the tail (tail_utilisation)
+    """
+    start = min(s for s, _ in job_times)
+    end = max(e for _, e in job_times)
+    last_start = max(s for s, _ in job_times)
+    makespan = end - start
+    tail = end - last_start
+    busy = sum(e - s for s, e in job_times)
+    tail_busy = sum(e - max(s, last_start) for s, e in job_times if e > last_start)
+    return {'makespan': makespan,
+            'tail': tail,
+            'utilisation': busy / (n_proc * makespan) if makespan > 0 else 1.0,
+            'tail_utilisation': tail_busy / (n_proc * tail) if tail > 0 else 1.0}
+
+
+def prebuild_topologies(experiments):
+    """Build the topology of each distinct topology specification of a set of
+    experiments and compile its shortest paths into a `PathTable`.
+
+    Experiments executed afterwards in this process or in processes forked
+    from it start from a copy of the prebuilt topology and share its
+    shortest paths, instead of building them again.
+
+    Parameters
+    ----------
+    experiments : iterable of Tree
+        The experiment parameters
+    """
+    for experiment in experiments:
+        if 'topology' not in experiment:
+            continue
+        spec = Tree(experiment['topology'])
+        key = spec.digest()
+        if key in _TOPOLOGIES:
+            continue
+        name = spec.pop('name', None)
+        if name not in TOPOLOGY_FACTORY:
+            # Reported when the experiment is run
+            continue
+        topology = TOPOLOGY_FACTORY[name](**spec)
+        shortest_path = PathTable(symmetrify_paths(nx.all_pairs_dijkstra_path(topology)))
+        _TOPOLOGIES[key] = (topology, shortest_path)
+        logger.info('Prebuilt topology %s: %d nodes', name,
+                    topology.number_of_nodes())
+
+
+def group_by_scenario(experiments):
+    """Group experiments whose parameters differ only in the strategy (and
+    description), preserving the order of the experiments.
+
+    Parameters
+    ----------
+    experiments : iterable of Tree
+        The experiment parameters
+
+    Returns
+    -------
+    groups : list of lists of Tree
+        The groups of experiments
+    """
+    groups = collections.OrderedDict()
+    for experiment in experiments:
+        scenario = Tree(experiment)
+        scenario.pop('strategy', None)
+        scenario.pop('desc', None)
+        key = repr(sorted(scenario.paths().items()))
+        groups.setdefault(key, []).append(experiment)
+    return list(groups.values())
+
+
+def _prepare_scenario(tree, logger):
+    """Build the topology and the workload of an experiment and place
+    computational resources, caches and contents on the topology.
+
+    Parameters
+    ----------
+    tree : Tree
+        experiment parameters tree. Names of the components used are popped
+        from the tree
+    logger : Logger
+        The logger on which errors are reported
+
+    Returns
+    -------
+    scenario : tuple
+        A (topology, workload, shortest_path) 3-tuple or *None* if the
+        implementation of any of the required components was not found.
+        shortest_path is the `PathTable` of the topology if it was prebuilt,
+        otherwise *None*
+    """
+    # Set topology
+    topology_spec = tree['topology']
+    topology_key = Tree(topology_spec).digest()
+    topology_name = topology_spec.pop('name')
+    if topology_key in _TOPOLOGIES:
+        topology, shortest_path = _TOPOLOGIES[topology_key]
+        topology = copy.deepcopy(topology)
+    elif topology_name not in TOPOLOGY_FACTORY:
+        logger.error('No topology factory implementation for %s was found.'
+                     % topology_name)
+        return None
+    else:
+        topology = TOPOLOGY_FACTORY[topology_name](**topology_spec)
+        shortest_path = None
+
+    workload_spec = tree['workload']
+    workload_name = workload_spec.pop('name')
+    if workload_name not in WORKLOAD:
+        logger.error('No workload implementation named %s was found.'
+                     % workload_name)
+        return None
+    workload = WORKLOAD[workload_name](topology, **workload_spec)
+
+    # Assign computation to nodes
+    if 'computation_placement' in tree:
+        computationpl_spec = tree['computation_placement']
+        computationpl_name = computationpl_spec.pop('name')
+        if computationpl_name not in COMPUTATION_PLACEMENT:
+            logger.error('No computation placement named %s was found.'
+                         % computationpl_name)
+            return None
+        COMPUTATION_PLACEMENT[computationpl_name](topology, **computationpl_spec)
+
+    # Assign caches to nodes
+    if 'cache_placement' in tree:
+        cachepl_spec = tree['cache_placement']
+        cachepl_name = cachepl_spec.pop('name')
+        if cachepl_name not in CACHE_PLACEMENT:
+            logger.error('No cache placement named %s was found.'
+                         % cachepl_name)
+            return None
+        network_cache = cachepl_spec.pop('network_cache')
+        # Cache budget is the cumulative number of cache entries across
+        # the whole network
+        cachepl_spec['cache_budget'] = workload.n_contents * network_cache
+        # Onur: need the full budget to assign to receivers for SIT cache placement
+        cachepl_spec['n_contents'] = workload.n_contents
+        CACHE_PLACEMENT[cachepl_name](topology, **cachepl_spec)
+
+    # Assign contents to sources
+    # If there are many contents, after doing this, performing operations
+    # requiring a topology deep copy, i.e. to_directed/undirected, will
+    # take long.
+    contpl_spec = tree['content_placement']
+    contpl_name = contpl_spec.pop('name')
+    if contpl_name not in CONTENT_PLACEMENT:
+        logger.error('No content placement implementation named %s was found.'
+                     % contpl_name)
+        return None
+    CONTENT_PLACEMENT[contpl_name](topology, workload.contents, **contpl_spec)
+    return topology, workload, shortest_path
+
+
+def _netconf(tree, shortest_path):
+    """Return the network configuration of an experiment, including its
+    shortest paths if they were prebuilt"""
+    netconf = dict(tree['netconf'])
+    if shortest_path is not None:
+        netconf['shortest_path'] = shortest_path
+    return netconf
+
+
+def _validate_components(tree, metrics, logger):
+    """Check that implementations of strategies, cache policy and data
+    collectors of an experiment exist.
+
+    Parameters
+    ----------
+    tree : Tree
+        experiment parameters tree
+    metrics : list
+        Names of the data collectors
+    logger : Logger
+        The logger on which errors are reported
+
+    Returns
+    -------
+    valid : bool
+        *True* if all implementations were found, *False* otherwise
+    """
+    strategy = tree['strategy']
+    warmup_strategy = tree['warmup_strategy']
+    if strategy['name'] not in STRATEGY:
+        logger.error('No implementation of strategy %s was found.' % strategy['name'])
+        return False
+    if warmup_strategy['name'] not in STRATEGY:
+        logger.error('No implementation of warm-up strategy %s was found.' % warmup_strategy['name'])
+        return False
+    cache_policy = tree['cache_policy']
+    if cache_policy['name'] not in CACHE_POLICY:
+        logger.error('No implementation of cache policy %s was found.' % cache_policy['name'])
+        return False
+    if any(m not in DATA_COLLECTOR for m in metrics):
+        logger.error('There are no implementations for at least one data collector specified')
+        return False
+    return True
+
+
+def _checkpoint(settings, params, curr_exp):
+    """Return the path of the checkpoint file of an experiment and the
+    interval between checkpoints.
+
+    Checkpointing is enabled by the CHECKPOINT_INTERVAL setting, expressing
+    the minimum wall-clock time in seconds between two checkpoints.
+    Checkpoints are stored in the directory specified by the CHECKPOINT_DIR
+    setting (by default *checkpoints*), and are named after the digest of the
+    experiment parameters and the sequence number of the experiment, so that
+    replications of the same experiment use different files.
+
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    params : Tree
+        experiment parameters tree
+    curr_exp : int
+        sequence number of the experiment
+
+    Returns
+    -------
+    checkpoint : tuple
+        A (path, interval) 2-tuple, or (None, None) if checkpointing is
+        disabled
+    """
+    if 'CHECKPOINT_INTERVAL' not in settings or not settings.CHECKPOINT_INTERVAL:
+        return None, None
+    directory = settings.CHECKPOINT_DIR if 'CHECKPOINT_DIR' in settings \
+                else 'checkpoints'
+    if not os.path.isdir(directory):
+        try:
+            os.makedirs(directory)
+        except OSError:
+            # Another process may have created it in the meantime
+            if not os.path.isdir(directory):
+                raise
+    name = '%s-%d.ckpt' % (Tree(params).digest(), curr_exp)
+    return os.path.join(directory, name), settings.CHECKPOINT_INTERVAL
+
+
+def _telemetry(settings):
+    """Return the telemetry of an experiment, with a profiler if required
+    by the PROFILE_INTERVAL setting"""
+    if 'PROFILE_INTERVAL' in settings and settings.PROFILE_INTERVAL:
+        return Telemetry(SamplingProfiler(settings.PROFILE_INTERVAL))
+    return Telemetry()
+
+
+def _log_profile(logger, results, curr_exp, n_exp):
+    """Log the breakdown of the time spent in each phase of the event loop,
+    if the experiment was profiled"""
+    if 'PERF' in results and 'PROFILE' in results['PERF']:
+        phases = results['PERF']['PROFILE']['PHASES']
+        logger.info('Experiment %d/%d | Profile | %s', curr_exp, n_exp,
+                    ', '.join('%s: %.1f%%' % (k, 100 * v) for k, v
+                              in sorted(phases.items(), key=lambda x: -x[1])))
+
+
+def _log_warmup(logger, results, curr_exp, n_exp):
+    """Log the number of warm-up requests of an experiment, if detected
+    automatically"""
+    if 'WARMUP' in results:
+        logger.info('Experiment %d/%d | Warm-up ended after %s requests (detected: %s)',
+                    curr_exp, n_exp, results['WARMUP']['N_REQUESTS'],
+                    results['WARMUP']['DETECTED'])
+
+
 def run_scenario(settings, params, curr_exp, n_exp):
     """Run a single scenario experiment
 
@@ -187,97 +840,61 @@ def run_scenario(settings, params, curr_exp, n_exp):
         # Get list of metrics required
         metrics = settings.DATA_COLLECTORS
 
+        # If a checkpoint of this experiment was saved by a previous,
+        # interrupted, run, resume the experiment from there
+        checkpoint, checkpoint_interval = _checkpoint(settings, params, curr_exp)
+        if checkpoint is not None and os.path.exists(checkpoint):
+            logger.info('Experiment %d/%d | Resuming simulation from checkpoint %s',
+                        curr_exp, n_exp, checkpoint)
+            results = resume_experiment(checkpoint, checkpoint_interval,
+                                        _telemetry(settings))
+            os.remove(checkpoint)
+            _log_warmup(logger, results, curr_exp, n_exp)
+            _log_profile(logger, results, curr_exp, n_exp)
+            duration = time.time() - start_time
+            logger.info('Experiment %d/%d | End simulation | Duration %s.',
+                        curr_exp, n_exp, timestr(duration, True))
+            return (params, results, duration)
+
+        telemetry = _telemetry(settings)
+
         # Copy parameters so that they can be manipulated
         tree = copy.deepcopy(params)
 
-        # Set topology
-        topology_spec = tree['topology']
-        topology_name = topology_spec.pop('name')
-        if topology_name not in TOPOLOGY_FACTORY:
-            logger.error('No topology factory implementation for %s was found.'
-                         % topology_name)
+        with telemetry.phase('TOPOLOGY'):
+            scenario = _prepare_scenario(tree, logger)
+        if scenario is None:
             return None
-        topology = TOPOLOGY_FACTORY[topology_name](**topology_spec)
+        topology, workload, shortest_path = scenario
 
-        workload_spec = tree['workload']
-        workload_name = workload_spec.pop('name')
-        if workload_name not in WORKLOAD:
-            logger.error('No workload implementation named %s was found.'
-                         % workload_name)
-            return None
-        workload = WORKLOAD[workload_name](topology, **workload_spec)
-
-       # Assign computation to nodes
-        if 'computation_placement' in tree:
-            computationpl_spec = tree['computation_placement']
-            computationpl_name = computationpl_spec.pop('name')
-            if computationpl_name not in COMPUTATION_PLACEMENT:
-                logger.error('No computation placement named %s was found.'
-                             % computationpl_name)
-                return None
-            COMPUTATION_PLACEMENT[computationpl_name](topology, **computationpl_spec)
-
-        # Assign caches to nodes
-        if 'cache_placement' in tree:
-            cachepl_spec = tree['cache_placement']
-            cachepl_name = cachepl_spec.pop('name')
-            if cachepl_name not in CACHE_PLACEMENT:
-                logger.error('No cache placement named %s was found.'
-                             % cachepl_name)
-                return None
-            network_cache = cachepl_spec.pop('network_cache')
-            # Cache budget is the cumulative number of cache entries across
-            # the whole network
-            cachepl_spec['cache_budget'] = workload.n_contents * network_cache
-            # Onur: need the full budget to assign to receivers for SIT cache placement
-            cachepl_spec['n_contents'] = workload.n_contents
-            CACHE_PLACEMENT[cachepl_name](topology, **cachepl_spec)
-
-        # Assign contents to sources
-        # If there are many contents, after doing this, performing operations
-        # requiring a topology deep copy, i.e. to_directed/undirected, will
-        # take long.
-        contpl_spec = tree['content_placement']
-        contpl_name = contpl_spec.pop('name')
-        if contpl_name not in CONTENT_PLACEMENT:
-            logger.error('No content placement implementation named %s was found.'
-                         % contpl_name)
+        if not _validate_components(tree, metrics, logger):
             return None
-        CONTENT_PLACEMENT[contpl_name](topology, workload.contents, **contpl_spec)
 
         # caching and routing strategy definition
         strategy = tree['strategy']
         warmup_strategy = tree['warmup_strategy']
-        if strategy['name'] not in STRATEGY:
-            logger.error('No implementation of strategy %s was found.' % strategy['name'])
-            return None
-        if warmup_strategy['name'] not in STRATEGY:
-            logger.error('No implementation of warm-up strategy %s was found.' % warmup_strategy['name'])
-            return None  
 
         # cache eviction policy definition
         cache_policy = tree['cache_policy']
-        if cache_policy['name'] not in CACHE_POLICY:
-            logger.error('No implementation of cache policy %s was found.' % cache_policy['name'])
-            return None
 
         # Configuration parameters of network model
-        netconf = tree['netconf']
+        netconf = _netconf(tree, shortest_path)
 
         # Text description of the scenario run to print on screen
         scenario = tree['desc'] if 'desc' in tree else "Description N/A"
 
         logger.info('Experiment %d/%d | Preparing scenario: %s', curr_exp, n_exp, scenario)
 
-        if any(m not in DATA_COLLECTOR for m in metrics):
-            logger.error('There are no implementations for at least one data collector specified')
-            return None
-
         collectors = {m: {} for m in metrics}
 
         logger.info('Experiment %d/%d | Start simulation', curr_exp, n_exp)
-        results = exec_experiment(topology, workload, netconf, strategy, cache_policy, collectors, warmup_strategy)
+        results = exec_experiment(topology, workload, netconf, strategy, cache_policy, collectors, warmup_strategy,
+                                  checkpoint, checkpoint_interval, telemetry)
+        if checkpoint is not None and os.path.exists(checkpoint):
+            os.remove(checkpoint)
 
+        _log_warmup(logger, results, curr_exp, n_exp)
+        _log_profile(logger, results, curr_exp, n_exp)
         duration = time.time() - start_time
         logger.info('Experiment %d/%d | End simulation | Duration %s.',
                     curr_exp, n_exp, timestr(duration, True))
@@ -291,3 +908,85 @@ def run_scenario(settings, params, curr_exp, n_exp):
         logger.error('Experiment %d/%d | Failed | %s: %s\n%s',
                      curr_exp, n_exp, err_type, err_message,
                      traceback.format_exc())
+
+
+def run_scenario_group(settings, params_list, curr_exps, n_exp):
+    """Run a group of experiments sharing the same scenario and differing only
+    in the strategy.
+
+    The scenario is built and warmed up only once and its warm state is then
+    forked into a measurement phase per experiment.
+
+    Parameters
+    ----------
+    settings : Settings
+        The simulator settings
+    params_list : list of Tree
+        experiment parameters trees. They must differ only in the strategy
+        and description
+    curr_exps : list of int
+        sequence numbers of the experiments
+    n_exp : int
+        Number of scheduled experiments
+
+    Returns
+    -------
+    results : list
+        A list with, for each experiment, the (params, results, duration)
+        3-tuple returned by run_scenario or *None* if the experiment failed.
+        The duration of the shared warm-up is split equally among experiments
+    """
+    try:
+        start_time = time.time()
+        proc_name = mp.current_process().name
+        logger = logging.getLogger('runner-%s' % proc_name)
+        metrics = settings.DATA_COLLECTORS
+
+        trees = [copy.deepcopy(params) for params in params_list]
+        if not all(_validate_components(tree, metrics, logger) for tree in trees):
+            return [None] * len(params_list)
+        tree = trees[0]
+        telemetry = _telemetry(settings)
+        with telemetry.phase('TOPOLOGY'):
+            scenario = _prepare_scenario(tree, logger)
+        if scenario is None:
+            return [None] * len(params_list)
+        topology, workload, shortest_path = scenario
+
+        for curr_exp, t in zip(curr_exps, trees):
+            desc = t['desc'] if 'desc' in t else "Description N/A"
+            logger.info('Experiment %d/%d | Preparing scenario: %s', curr_exp, n_exp, desc)
+
+        collectors = {m: {} for m in metrics}
+        strategies = [t['strategy'] for t in trees]
+
+        logger.info('Experiments %s/%d | Start simulation with shared warm-up',
+                    ",".join(str(i) for i in curr_exps), n_exp)
+        group_results = exec_experiment_group(topology, workload, _netconf(tree, shortest_path),
+                                              strategies, tree['cache_policy'],
+                                              collectors, tree['warmup_strategy'],
+                                              telemetry)
+
+        duration = (time.time() - start_time) / len(params_list)
+        ret = []
+        for params, results, curr_exp in zip(params_list, group_results, curr_exps):
+            if results is None:
+                logger.error('Experiment %d/%d | Failed', curr_exp, n_exp)
+                ret.append(None)
+                continue
+            _log_warmup(logger, results, curr_exp, n_exp)
+            _log_profile(logger, results, curr_exp, n_exp)
+            logger.info('Experiment %d/%d | End simulation | Duration %s.',
+                        curr_exp, n_exp, timestr(duration, True))
+            ret.append((params, results, duration))
+        return ret
+    except KeyboardInterrupt:
+        logger.error('Received keyboard interrupt. Terminating')
+        sys.exit(-signal.SIGINT)
+    except Exception as e:
+        err_type = str(type(e)).split("'")[1].split(".")[1]
+        err_message = e.message
+        logger.error('Experiments %s/%d | Failed | %s: %s\n%s',
+                     ",".join(str(i) for i in curr_exps), n_exp, err_type,
+                     err_message, traceback.format_exc())
+        return [None] * len(params_list)
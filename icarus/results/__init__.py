@@ -1,5 +1,7 @@
 """This package contains the code in charge of processing experiment results.
 """
 from .readwrite import *
+from .columnar import *
+from .cache import *
 from .plot import *
 from .visualize import *
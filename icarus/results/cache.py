@@ -0,0 +1,263 @@
+"""Persistent cache of experiment results.
+
+Results of each experiment are stored in a directory, keyed by a hash of the
+experiment parameters, the data collectors used and a fingerprint of the code
+of the components used by the experiment. Campaigns can therefore reuse the
+results of experiments executed by previous campaigns, as long as neither
+their parameters nor the code of the components they use changed.
+
+The fingerprint covers the source files of the modules implementing the
+components named in the experiment parameters (topology, workload,
+placements, strategies and cache policy) and the data collectors, as well as
+the modules implementing the network model and the simulation engine.
+Changes to other code used indirectly by these components are not detected:
+the cache must then be invalidated manually.
+"""
+import os
+import sys
+import time
+import hashlib
+import inspect
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from icarus.util import Tree
+from icarus.registry import TOPOLOGY_FACTORY, WORKLOAD, CACHE_PLACEMENT, \
+                            COMPUTATION_PLACEMENT, CONTENT_PLACEMENT, STRATEGY, \
+                            CACHE_POLICY, DATA_COLLECTOR
+
+
+__all__ = ['ResultCache']
+
+
+# Registries of the components which can be named in experiment parameters,
+# keyed by parameter name
+COMPONENT_REGISTRIES = {
+    'topology': TOPOLOGY_FACTORY,
+    'workload': WORKLOAD,
+    'cache_placement': CACHE_PLACEMENT,
+    'computation_placement': COMPUTATION_PLACEMENT,
+    'content_placement': CONTENT_PLACEMENT,
+    'strategy': STRATEGY,
+    'warmup_strategy': STRATEGY,
+    'cache_policy': CACHE_POLICY,
+                        }
+
+# Modules used by all experiments
+CORE_MODULES = [
+    'icarus.execution.network',
+    'icarus.execution.engine',
+    'icarus.models.service.compSpot',
+               ]
+
+
+class ResultCache(object):
+    """Persistent cache of experiment results.
+
+    Each entry of the cache stores the results of all replications of an
+    experiment executed so far, in order of completion.
+    """
+
+    def __init__(self, directory):
+        """Constructor
+
+        Parameters
+        ----------
+        directory : str
+            The directory where results are stored. It is created if it does
+            not exist
+        """
+        self.directory = directory
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._file_digests = {}
+
+    def _file_digest(self, path):
+        """Return the MD5 digest of a source file"""
+        if path not in self._file_digests:
+            with open(path, 'rb') as f:
+                self._file_digests[path] = hashlib.md5(f.read()).hexdigest()
+        return self._file_digests[path]
+
+    def fingerprint(self, params, collectors):
+        """Return a fingerprint of the code of the components used by an
+        experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+        collectors : list
+            Names of the data collectors
+
+        Returns
+        -------
+        fingerprint : str
+            The fingerprint
+        """
+        objs = [registry[params[k]['name']]
+                for k, registry in COMPONENT_REGISTRIES.items()
+                if k in params and 'name' in params[k]
+                and params[k]['name'] in registry]
+        objs.extend(DATA_COLLECTOR[c] for c in collectors if c in DATA_COLLECTOR)
+        objs.extend(sys.modules[m] for m in CORE_MODULES)
+        paths = sorted(set(inspect.getsourcefile(obj) for obj in objs))
+        return hashlib.md5(repr([(os.path.basename(p), self._file_digest(p))
+                                 for p in paths])).hexdigest()
+
+    def key(self, params, collectors):
+        """Return the key of the cache entry of an experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+        collectors : list
+            Names of the data collectors
+
+        Returns
+        -------
+        key : str
+            The key
+        """
+        return hashlib.md5(repr((Tree(params).digest(), sorted(collectors),
+                                 self.fingerprint(params, collectors)))).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, '%s.pickle' % key)
+
+    def get(self, params, collectors):
+        """Return the cached results of an experiment
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+        collectors : list
+            Names of the data collectors
+
+        Returns
+        -------
+        results : list of Tree
+            The results of each cached replication of the experiment, or an
+            empty list if none is cached
+        """
+        entry = self.load(self.key(params, collectors))
+        return entry['results'] if entry is not None else []
+
+    def put(self, params, collectors, results):
+        """Add the results of a replication of an experiment to the cache
+
+        Parameters
+        ----------
+        params : Tree
+            experiment parameters tree
+        collectors : list
+            Names of the data collectors
+        results : Tree
+            The results of the experiment
+        """
+        key = self.key(params, collectors)
+        entry = self.load(key)
+        if entry is None:
+            entry = {'params': params, 'collectors': sorted(collectors),
+                     'fingerprint': self.fingerprint(params, collectors),
+                     'results': []}
+        entry['results'].append(results)
+        entry['time'] = time.time()
+        path = self._path(key)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, path)
+
+    def load(self, key):
+        """Load a cache entry
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry
+
+        Returns
+        -------
+        entry : dict
+            The entry, with the experiment parameters (params), the data
+            collectors (collectors), the code fingerprint (fingerprint), the
+            results of each replication (results) and the time at which it
+            was last updated (time), or *None* if there is no entry with the
+            given key
+        """
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def keys(self):
+        """Return the keys of all cache entries
+
+        Returns
+        -------
+        keys : list
+            The keys
+        """
+        return sorted(name[:-len('.pickle')] for name in os.listdir(self.directory)
+                      if name.endswith('.pickle'))
+
+    def stale_keys(self):
+        """Return the keys of the entries whose components changed since
+        they were cached, and which will therefore never be used again
+
+        Returns
+        -------
+        keys : list
+            The keys of stale entries
+        """
+        stale = []
+        for key in self.keys():
+            entry = self.load(key)
+            try:
+                if self.key(entry['params'], entry['collectors']) != key:
+                    stale.append(key)
+            except KeyError:
+                # Components no longer registered
+                stale.append(key)
+        return stale
+
+    def remove(self, key):
+        """Remove an entry from the cache
+
+        Parameters
+        ----------
+        key : str
+            The key of the entry
+        """
+        os.remove(self._path(key))
+
+    def invalidate(self, condition=None):
+        """Remove entries from the cache
+
+        Parameters
+        ----------
+        condition : dict, optional
+            Parameters that experiments must match to be removed, in the same
+            format of `ResultSet.filter`. If not specified, all entries are
+            removed
+
+        Returns
+        -------
+        n_removed : int
+            The number of entries removed
+        """
+        n_removed = 0
+        for key in self.keys():
+            if condition:
+                entry = self.load(key)
+                if not Tree(entry['params']).match(condition):
+                    continue
+            self.remove(key)
+            n_removed += 1
+        return n_removed
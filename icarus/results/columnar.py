@@ -0,0 +1,459 @@
+"""Columnar, indexed storage of experiment results.
+
+A `ColumnarResultSet` stores the results of a campaign by column rather than
+by experiment:
+
+ * each path of the parameters trees is a dimension column, storing for each
+   experiment the integer code of its value in a list of distinct values, and
+   indexed by value so that filtering by parameters does not need to scan
+   all experiments
+ * each path of the results trees whose values are all scalars (numbers or
+   booleans) is a metric column, stored as a NumPy array
+ * all other results, e.g. CDFs or per-node values, are stored separately for
+   each experiment and only loaded when accessed
+
+On disk, a columnar result set is a directory with the columns stored in a
+NumPy archive (columns.npz), the layout of the columns and the global
+attributes in a pickle file (meta.pickle) and the other results of each
+experiment as consecutive pickle records (blobs.pickle).
+"""
+import os
+import numbers
+import collections
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import numpy as np
+
+from icarus.util import Tree
+from icarus.registry import register_results_reader, register_results_writer
+from icarus.results.readwrite import ResultSet
+
+
+__all__ = [
+    'ColumnarResultSet',
+    'write_results_columnar',
+    'read_results_columnar'
+           ]
+
+
+# Types of values stored in metric columns and functions restoring them
+_METRIC_TYPES = {'bool': bool, 'int': int, 'float': float}
+
+
+def _key(value):
+    """Return a hashable key identifying a parameter value"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ('__unhashable__', repr(value))
+
+
+def _metric_type(value):
+    """Return the type of a metric column able to store a value, or None if
+    the value cannot be stored in a metric column"""
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool'
+    if isinstance(value, numbers.Integral):
+        return 'int'
+    if isinstance(value, numbers.Real):
+        return 'float'
+    return None
+
+
+class _Columns(object):
+    """Columns of a columnar result set, shared by all its subsets"""
+
+    def __init__(self, attr, n, levels, codes, metrics, metric_types, missing,
+                 blob_paths, blobs=None, blob_path=None, blob_offsets=None):
+        self.attr = attr
+        self.n = n
+        # Distinct values and code of the value of each experiment, keyed by
+        # parameter path
+        self.levels = levels
+        self.codes = codes
+        # Values, type and mask of missing values (if any), keyed by metric
+        # path
+        self.metrics = metrics
+        self.metric_types = metric_types
+        self.missing = missing
+        # Paths of other results and other results of each experiment,
+        # either in memory or in a file
+        self.blob_paths = blob_paths
+        self.blobs = blobs
+        self.blob_path = blob_path
+        self.blob_offsets = blob_offsets
+        self._blob_file = None
+        # Rows of each parameter value, keyed by parameter path and built on
+        # first use
+        self._index = {}
+        self._level_codes = {}
+
+    def rows(self, path, value):
+        """Return the sorted array of rows whose parameter at the given path
+        has the given value"""
+        if path not in self.levels:
+            # Tree.getval returns None for missing paths
+            return np.arange(self.n) if value is None else np.arange(0)
+        if path not in self._index:
+            codes = self.codes[path]
+            order = np.argsort(codes, kind='mergesort')
+            bounds = np.searchsorted(codes[order], np.arange(len(self.levels[path]) + 1))
+            self._index[path] = [order[bounds[i]:bounds[i + 1]]
+                                 for i in range(len(self.levels[path]))]
+            self._level_codes[path] = dict((_key(v), i) for i, v
+                                           in enumerate(self.levels[path]))
+        code = self._level_codes[path].get(_key(value))
+        return self._index[path][code] if code is not None else np.arange(0)
+
+    def blob(self, row):
+        """Return the dict of other results of an experiment"""
+        if self.blobs is not None:
+            return self.blobs[row]
+        if self._blob_file is None:
+            self._blob_file = open(self.blob_path, 'rb')
+        self._blob_file.seek(self.blob_offsets[row])
+        return pickle.load(self._blob_file)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_blob_file'] = None
+        return state
+
+
+class ColumnarResultSet(object):
+    """Result set storing parameters and results by column.
+
+    It supports the same read operations of `ResultSet`, plus `values` and
+    `group_by`, which operate on columns without building the trees of each
+    experiment. Subsets returned by `filter` and `group_by` share columns
+    with the result set they are extracted from.
+    """
+
+    def __init__(self, columns, rows=None):
+        """Constructor
+
+        Parameters
+        ----------
+        columns : _Columns
+            The columns storing the results
+        rows : array, optional
+            The sorted rows of the columns included in the result set. If not
+            specified, all rows are included
+        """
+        self._columns = columns
+        self._rows = np.arange(columns.n) if rows is None else rows
+
+    @classmethod
+    def from_resultset(cls, resultset):
+        """Build a columnar result set from a result set
+
+        Parameters
+        ----------
+        resultset : ResultSet
+            The result set to convert
+
+        Returns
+        -------
+        resultset : ColumnarResultSet
+            The columnar result set
+        """
+        params = [Tree(p).paths() for p, _ in resultset]
+        results = [Tree(r).paths() for _, r in resultset]
+        n = len(params)
+        levels, codes = {}, {}
+        for path in set(p for row in params for p in row):
+            col_levels, col_codes = [], {}
+            codes[path] = np.empty(n, dtype=np.int32)
+            for i, row in enumerate(params):
+                value = row.get(path)
+                key = _key(value)
+                if key not in col_codes:
+                    col_codes[key] = len(col_levels)
+                    col_levels.append(value)
+                codes[path][i] = col_codes[key]
+            levels[path] = col_levels
+        metric_types = {}
+        blob_paths = set()
+        for row in results:
+            for path, value in row.items():
+                if path in blob_paths:
+                    continue
+                t = _metric_type(value)
+                if t is None:
+                    blob_paths.add(path)
+                    metric_types.pop(path, None)
+                elif metric_types.get(path) != 'float':
+                    # A column storing ints and floats is a float column
+                    metric_types[path] = t if metric_types.get(path, t) == t \
+                                         else 'float'
+        metrics, missing = {}, {}
+        for path in metric_types:
+            col_missing = np.array([path not in row for row in results], dtype=bool)
+            metrics[path] = np.array([row.get(path, 0) for row in results],
+                                     dtype=np.float64 if metric_types[path] == 'float'
+                                           else np.int64)
+            if col_missing.any():
+                missing[path] = col_missing
+        blobs = [dict((p, v) for p, v in row.items() if p in blob_paths)
+                 for row in results]
+        columns = _Columns(dict(resultset.attr), n, levels, codes, metrics,
+                           metric_types, missing, blob_paths, blobs=blobs)
+        return cls(columns)
+
+    def to_resultset(self):
+        """Convert to a result set
+
+        Returns
+        -------
+        resultset : ResultSet
+            The result set
+        """
+        resultset = ResultSet(dict(self.attr))
+        for params, results in self:
+            resultset.add(params, results)
+        return resultset
+
+    @property
+    def attr(self):
+        """Dictionary of common attributes to all experiments"""
+        return self._columns.attr
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        return (self._experiment(row) for row in self._rows)
+
+    def __getitem__(self, i):
+        return self._experiment(self._rows[i])
+
+    def _params(self, row):
+        """Return the parameters tree of an experiment"""
+        columns = self._columns
+        params = Tree()
+        for path, codes in columns.codes.items():
+            value = columns.levels[path][codes[row]]
+            if value is not None:
+                params.setval(path, value)
+        return params
+
+    def _results(self, row):
+        """Return the results tree of an experiment"""
+        columns = self._columns
+        results = Tree()
+        for path, values in columns.metrics.items():
+            if path in columns.missing and columns.missing[path][row]:
+                continue
+            results.setval(path, _METRIC_TYPES[columns.metric_types[path]](values[row]))
+        for path, value in columns.blob(row).items():
+            results.setval(path, value)
+        return results
+
+    def _experiment(self, row):
+        return self._params(row), self._results(row)
+
+    def dump(self):
+        """Dump all results in a list
+
+        Returns
+        -------
+        results : list
+            A list of (parameters, results) tuples
+        """
+        return list(self)
+
+    def filter(self, condition):
+        """Return subset of results matching specific conditions
+
+        Parameters
+        ----------
+        condition : dict
+            Dictionary listing all parameters and values to be matched in the
+            results set, with the same format used by `ResultSet.filter`
+
+        Returns
+        -------
+        filtered_results : ColumnarResultSet
+            The subset of results matching the condition
+        """
+        rows = self._rows
+        for path, value in Tree(condition).paths().items():
+            rows = np.intersect1d(rows, self._columns.rows(path, value),
+                                  assume_unique=True)
+            if len(rows) == 0:
+                break
+        return ColumnarResultSet(self._columns, rows)
+
+    def group_by(self, paths, condition=None):
+        """Group experiments by the values of some parameters
+
+        Parameters
+        ----------
+        paths : list of tuples
+            The paths of the parameters to group by
+        condition : dict, optional
+            If specified, only experiments matching the condition are grouped
+
+        Returns
+        -------
+        groups : OrderedDict
+            The subset of results of each group, keyed by the tuple of values
+            of the grouping parameters, in order of first occurrence
+        """
+        subset = self.filter(condition) if condition else self
+        columns, rows = self._columns, subset._rows
+        paths = [tuple(p) for p in paths]
+        missing = [p for p in paths if p not in columns.codes]
+        if missing:
+            raise ValueError('No parameter with path %s' % str(missing[0]))
+        codes = [columns.codes[p][rows] for p in paths]
+        dims = [len(columns.levels[p]) for p in paths]
+        group_ids = np.ravel_multi_index(codes, dims) if paths \
+                    else np.zeros(len(rows), dtype=np.int64)
+        _, first, inverse = np.unique(group_ids, return_index=True,
+                                      return_inverse=True)
+        groups = collections.OrderedDict()
+        for group in np.argsort(first, kind='mergesort'):
+            row = rows[first[group]]
+            key = tuple(columns.levels[p][columns.codes[p][row]] for p in paths)
+            groups[key] = ColumnarResultSet(columns, rows[inverse == group])
+        return groups
+
+    def values(self, path, condition=None):
+        """Return the values of a result of the experiments matching a
+        condition. Experiments without the result are skipped.
+
+        Parameters
+        ----------
+        path : tuple
+            The path of the result in the results tree
+        condition : dict, optional
+            If specified, only experiments matching the condition are
+            considered
+
+        Returns
+        -------
+        values : list
+            The values of the result
+        """
+        subset = self.filter(condition) if condition else self
+        columns, rows, path = self._columns, subset._rows, tuple(path)
+        if path in columns.metrics:
+            values = columns.metrics[path][rows]
+            if path in columns.missing:
+                values = values[~columns.missing[path][rows]]
+            return [_METRIC_TYPES[columns.metric_types[path]](v) for v in values]
+        if path in columns.blob_paths:
+            values = (columns.blob(row).get(path) for row in rows)
+        else:
+            # The path may lead to a subtree of results
+            values = (self._results(row).getval(path) for row in rows)
+        return [v for v in values if v is not None]
+
+    def column(self, path, condition=None):
+        """Return the values of a metric of the experiments matching a
+        condition as an array
+
+        Parameters
+        ----------
+        path : tuple
+            The path of the metric in the results tree
+        condition : dict, optional
+            If specified, only experiments matching the condition are
+            considered
+
+        Returns
+        -------
+        column : array
+            The values of the metric as floats, NaN for experiments without
+            it
+        """
+        subset = self.filter(condition) if condition else self
+        columns, rows, path = self._columns, subset._rows, tuple(path)
+        if path not in columns.metrics:
+            raise ValueError('No metric with path %s' % str(path))
+        values = columns.metrics[path][rows]
+        if path in columns.missing:
+            values = np.where(columns.missing[path][rows], np.nan, values)
+        else:
+            values = values.astype(np.float64)
+        return values
+
+
+@register_results_writer('COLUMNAR')
+def write_results_columnar(results, path):
+    """Write a resultset to a directory in columnar format
+
+    Parameters
+    ----------
+    results : ResultSet or ColumnarResultSet
+        The set of results
+    path : str
+        The path of the directory to which write
+    """
+    if not isinstance(results, ColumnarResultSet):
+        results = ColumnarResultSet.from_resultset(results)
+    if not os.path.isdir(path):
+        os.makedirs(path)
+    columns, rows = results._columns, results._rows
+    param_paths = sorted(columns.codes)
+    metric_paths = sorted(columns.metrics)
+    arrays = {}
+    for i, p in enumerate(param_paths):
+        # Subsets keep all levels, so that codes do not need to be remapped
+        arrays['p%d' % i] = columns.codes[p][rows]
+    for i, p in enumerate(metric_paths):
+        arrays['m%d' % i] = columns.metrics[p][rows]
+        if p in columns.missing:
+            arrays['x%d' % i] = columns.missing[p][rows]
+    np.savez(os.path.join(path, 'columns.npz'), **arrays)
+    offsets = np.empty(len(rows), dtype=np.int64)
+    with open(os.path.join(path, 'blobs.pickle'), 'wb') as f:
+        for i, row in enumerate(rows):
+            offsets[i] = f.tell()
+            pickle.dump(columns.blob(row), f, pickle.HIGHEST_PROTOCOL)
+    meta = {'attr': columns.attr,
+            'n': len(rows),
+            'params': [(p, columns.levels[p]) for p in param_paths],
+            'metrics': [(p, columns.metric_types[p]) for p in metric_paths],
+            'blob_paths': columns.blob_paths,
+            'blob_offsets': offsets}
+    with open(os.path.join(path, 'meta.pickle'), 'wb') as f:
+        pickle.dump(meta, f, pickle.HIGHEST_PROTOCOL)
+
+
+@register_results_reader('COLUMNAR')
+def read_results_columnar(path):
+    """Read a resultset from a directory in columnar format.
+
+    Columns are loaded immediately, while results not stored in columns are
+    loaded when accessed.
+
+    Parameters
+    ----------
+    path : str
+        The path of the directory from which results are read
+
+    Returns
+    -------
+    results : ColumnarResultSet
+        The read result set
+    """
+    with open(os.path.join(path, 'meta.pickle'), 'rb') as f:
+        meta = pickle.load(f)
+    arrays = np.load(os.path.join(path, 'columns.npz'))
+    levels = dict(meta['params'])
+    codes = dict((p, arrays['p%d' % i]) for i, (p, _) in enumerate(meta['params']))
+    metric_types = dict(meta['metrics'])
+    metrics = dict((p, arrays['m%d' % i]) for i, (p, _) in enumerate(meta['metrics']))
+    missing = dict((p, arrays['x%d' % i]) for i, (p, _) in enumerate(meta['metrics'])
+                   if 'x%d' % i in arrays)
+    columns = _Columns(meta['attr'], meta['n'], levels, codes, metrics,
+                       metric_types, missing, meta['blob_paths'],
+                       blob_path=os.path.join(path, 'blobs.pickle'),
+                       blob_offsets=meta['blob_offsets'])
+    return ColumnarResultSet(columns)
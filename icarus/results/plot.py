@@ -3,7 +3,13 @@
 """
 from __future__ import division
 import os
+import logging
 import collections
+import multiprocessing as mp
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
 
 import numpy as np
 import matplotlib
@@ -11,9 +17,20 @@ import matplotlib.pyplot as plt
 
 from icarus.util import Tree, step_cdf
 from icarus.tools import means_confidence_interval
+from icarus.registry import RESULTS_READER
+from icarus.results.columnar import ColumnarResultSet
 
 
-__all__ = ['plot_lines', 'plot_bar_chart', 'plot_cdf']
+__all__ = [
+    'SummaryTable',
+    'plot_lines',
+    'plot_bar_chart',
+    'plot_cdf',
+    'plot_all'
+           ]
+
+
+logger = logging.getLogger('plot')
 
 
 # These lines prevent insertion of Type 3 fonts in figures
@@ -42,14 +59,262 @@ BW_COLOR_CATALOGUE = ['k', '0.2', '0.3', '0.4', '0.5', '0.6', '0.7', '0.8', '0.9
 HATCH_CATALOGUE = [None, '/', '\\', '\\\\', '//', '+', 'x', '*', 'o', '.', '|', '-', 'O']
 
 
+def _value_key(value):
+    """Return a hashable key identifying a parameter value"""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ('__unhashable__', repr(value))
+
+
+class SummaryTable(object):
+    """Table of summary statistics of the results of a resultset, used to
+    plot graphs without filtering the resultset again for each point.
+
+    Each entry of the table is identified by a query, i.e. a condition on
+    experiment parameters, the path of a metric and the statistic computed on
+    the values of the metric of all matching experiments. Statistics are
+    either ('MEAN', confidence), i.e. the mean and confidence interval
+    computed by `means_confidence_interval`, or ('FIRST',), i.e. the first
+    value found.
+
+    Entries of all queries are computed in a single pass over the resultset.
+    Tables can be saved to disk, so that graphs can be drawn again, e.g.
+    after changing their labels, without reading the resultset.
+    """
+
+    def __init__(self, source=None):
+        """Constructor
+
+        Parameters
+        ----------
+        source : any hashable type, optional
+            An identifier of the resultset from which statistics are
+            computed, used to invalidate tables saved to disk
+        """
+        self.source = source
+        self._stats = {}
+
+    def __len__(self):
+        return len(self._stats)
+
+    def __contains__(self, query):
+        return self.key(*query) in self._stats
+
+    @staticmethod
+    def key(condition, metric, stat):
+        """Return the key of the entry of a query
+
+        Parameters
+        ----------
+        condition : dict
+            Parameters that experiments must match
+        metric : tuple
+            The path of the metric
+        stat : tuple
+            The statistic
+
+        Returns
+        -------
+        key : str
+            The key
+        """
+        return repr((sorted(Tree(condition).paths().items()), tuple(metric),
+                     tuple(stat)))
+
+    def get(self, condition, metric, stat):
+        """Return the statistic of a metric
+
+        Parameters
+        ----------
+        condition : dict
+            Parameters that experiments must match
+        metric : tuple
+            The path of the metric
+        stat : tuple
+            The statistic
+
+        Returns
+        -------
+        value : any type
+            A (mean, err) tuple for ('MEAN', confidence) statistics, or the
+            first value (or *None* if none was found) for ('FIRST',)
+            statistics
+        """
+        return self._stats[self.key(condition, metric, stat)]
+
+    def update(self, resultset, queries):
+        """Compute the statistics of the queries not in the table yet
+
+        Parameters
+        ----------
+        resultset : ResultSet
+            The resultset from which statistics are computed
+        queries : iterable
+            The (condition, metric, stat) tuples of the queries
+
+        Returns
+        -------
+        n_computed : int
+            The number of queries computed
+        """
+        pending = {}
+        for condition, metric, stat in queries:
+            key = self.key(condition, metric, stat)
+            if key not in self._stats:
+                pending[key] = (Tree(condition), tuple(metric), tuple(stat))
+        if not pending:
+            return 0
+        if isinstance(resultset, ColumnarResultSet):
+            # Columnar resultsets are indexed, so each query is cheap
+            data = dict((key, resultset.values(metric, condition))
+                        for key, (condition, metric, _) in pending.items())
+        else:
+            data = self._scan(resultset, pending)
+        for key, (_, _, stat) in pending.items():
+            values = data[key]
+            if stat[0] == 'MEAN':
+                self._stats[key] = means_confidence_interval(values, stat[1])
+            elif stat[0] == 'FIRST':
+                self._stats[key] = values[0] if values else None
+            else:
+                raise ValueError('Statistic %s not supported' % str(stat[0]))
+        return len(pending)
+
+    @staticmethod
+    def _scan(resultset, pending):
+        """Collect the values of the metrics of all pending queries with a
+        single pass over the resultset"""
+        # Queries are grouped by the paths of their conditions. For each
+        # group, queries are indexed by the values of those paths, so that
+        # the queries matched by an experiment are found with one lookup
+        groups = collections.defaultdict(lambda: collections.defaultdict(list))
+        for key, (condition, metric, _) in pending.items():
+            items = sorted(condition.paths().items())
+            paths = tuple(path for path, _ in items)
+            values = tuple(_value_key(value) for _, value in items)
+            groups[paths][values].append((key, metric))
+        data = dict((key, []) for key in pending)
+        for parameters, results in resultset:
+            parameters = Tree(parameters)
+            for paths, index in groups.items():
+                values = tuple(_value_key(parameters.getval(path)) for path in paths)
+                for key, metric in index.get(values, ()):
+                    value = results.getval(metric)
+                    if value is not None:
+                        data[key].append(value)
+        return data
+
+    def subset(self, queries):
+        """Return a table with the entries of some queries only
+
+        Parameters
+        ----------
+        queries : iterable
+            The (condition, metric, stat) tuples of the queries
+
+        Returns
+        -------
+        table : SummaryTable
+            The table
+        """
+        table = SummaryTable(self.source)
+        for query in queries:
+            key = self.key(*query)
+            table._stats[key] = self._stats[key]
+        return table
+
+    def save(self, path):
+        """Save the table to a file
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        """
+        with open(path, 'wb') as f:
+            pickle.dump(self, f, pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def load(path, source=None):
+        """Load a table from a file
+
+        Parameters
+        ----------
+        path : str
+            The path of the file
+        source : any hashable type, optional
+            The identifier of the resultset from which statistics must have
+            been computed
+
+        Returns
+        -------
+        table : SummaryTable
+            The table read from file or an empty table if the file does not
+            exist or the table was computed from another resultset
+        """
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                table = pickle.load(f)
+            if table.source == source:
+                return table
+        return SummaryTable(source)
+
+
+def _yconditions(desc):
+    """Return the condition and the metric of each line or bar of a plot,
+    without the condition on the x parameter"""
+    if 'filter' not in desc or desc['filter'] is None:
+        desc['filter'] = {}
+    ymetrics = desc['ymetrics']
+    ycondnames = desc['ycondnames'] if 'ycondnames' in desc else None
+    ycondvals = desc['ycondvals'] if 'ycondvals' in desc else None
+    conditions = []
+    for i in range(len(ymetrics)):
+        condition = Tree(desc['filter'])
+        if ycondnames is not None:
+            condition.setval(ycondnames[i], ycondvals[i])
+        conditions.append((condition, ymetrics[i]))
+    return conditions
+
+
+def _mean_queries(desc):
+    """Return the queries of a plot showing means of metrics vs x values"""
+    stat = ('MEAN', desc['confidence'] if 'confidence' in desc else 0.95)
+    queries = []
+    for condition, metric in _yconditions(desc):
+        for xval in desc['xvals']:
+            xcondition = Tree(condition)
+            xcondition.setval(desc['xparam'], xval)
+            queries.append((xcondition, metric, stat))
+    return queries
+
+
+def _cdf_queries(desc):
+    """Return the queries of a CDF plot"""
+    return [(condition, metric, ('FIRST',))
+            for condition, metric in _yconditions(desc)]
+
+
+def _summary(resultset, queries):
+    """Return a summary table with the given queries, computing it from the
+    resultset if it is not already a summary table"""
+    if isinstance(resultset, SummaryTable):
+        return resultset
+    summary = SummaryTable()
+    summary.update(resultset, queries)
+    return summary
+
+
 def plot_lines(resultset, desc, filename, plotdir):
     """Plot a graph with characteristics described in the plot descriptor out
     of the data contained in the resultset and save the plot in given directory.
 
     Parameters
     ----------
-    rs : ResultSet
-        Result set
+    resultset : ResultSet or SummaryTable
+        Result set, or summary table including the statistics of the plot
     desc : dict
         The plot descriptor (more info below)
     filename : str
@@ -144,8 +409,7 @@ def plot_lines(resultset, desc, filename, plotdir):
         The limits of the y axis. If not specified, they're automatically
         selected by Matplotlib
     """
-    fig = plt.figure()
-    _, ax1 = plt.subplots()
+    fig, ax1 = plt.subplots()
     if 'title' in desc:
         plt.title(desc['title'])
     if 'xlabel' in desc:
@@ -181,6 +445,7 @@ def plot_lines(resultset, desc, filename, plotdir):
     plot_args = desc['plot_args'] if 'plot_args' in desc else {}
     plot_empty = desc['plotempty'] if 'plotempty' in desc else True
     empty = True
+    summary = _summary(resultset, _mean_queries(desc))
     for i in range(len(yvals)):
         means = np.zeros(len(xvals))
         err = np.zeros(len(xvals))
@@ -189,11 +454,9 @@ def plot_lines(resultset, desc, filename, plotdir):
             condition.setval(desc['xparam'], xvals[j])
             if ycondnames is not None:
                 condition.setval(ycondnames[i], ycondvals[i])
-            data = [v.getval(ymetrics[i])
-                    for _, v in resultset.filter(condition)
-                    if v.getval(ymetrics[i]) is not None]
             confidence = desc['confidence'] if 'confidence' in desc else 0.95
-            means[j], err[j] = means_confidence_interval(data, confidence)
+            means[j], err[j] = summary.get(condition, ymetrics[i],
+                                           ('MEAN', confidence))
         yerr = None if 'errorbar' in desc and not desc['errorbar'] or all(err == 0) else err
         fmt = desc['line_style'][yvals[i]] if 'line_style' in desc \
               and yvals[i] in desc['line_style'] else '-'
@@ -205,6 +468,7 @@ def plot_lines(resultset, desc, filename, plotdir):
             plt.errorbar(xvals, means, yerr=yerr, fmt=fmt, **plot_args)
             empty = False
     if empty and not plot_empty:
+        plt.close(fig)
         return
     x_min = desc['xmin'] if 'xmin' in desc else min(xvals)
     x_max = desc['xmax'] if 'xmax' in desc else max(xvals)
@@ -230,8 +494,8 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
 
     Parameters
     ----------
-    rs : ResultSet
-        Result set
+    resultset : ResultSet or SummaryTable
+        Result set, or summary table including the statistics of the plot
     desc : dict
         The plot descriptor (more info below)
     filename : str
@@ -331,10 +595,9 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
         The upper limit of the y axis. If not specified, it is automatically
         selected by Matplotlib
     """
-    fig = plt.figure()
+    fig, ax1 = plt.subplots()
     if 'title' in desc:
         plt.title(desc['title'])
-    _, ax1 = plt.subplots()
     plt.grid(b=True, which='major', color='k', axis='y', linestyle=':')
     # Set axis below bars
     ax1.set_axisbelow(True)
@@ -392,6 +655,7 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
         hatch = dict((y, HATCH_CATALOGUE[yvals.index(y)]) for y in yvals)
     else:
         hatch = collections.defaultdict(lambda: None)
+    summary = _summary(resultset, _mean_queries(desc))
     # Plot bars
     left = border  # left-most point of the bar about to draw
     for i in range(len(desc['xvals'])):
@@ -403,11 +667,9 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
                 condition.setval(desc['xparam'], desc['xvals'][i])
                 if ycondnames is not None:
                     condition.setval(ycondnames[l], ycondvals[l])
-                data = [v.getval(ymetrics[l])
-                        for _, v in resultset.filter(condition)
-                        if v.getval(ymetrics[l]) is not None]
                 confidence = desc['confidence'] if 'confidence' in desc else 0.95
-                meanval, err = means_confidence_interval(data, confidence)
+                meanval, err = summary.get(condition, ymetrics[l],
+                                           ('MEAN', confidence))
                 yerr = None if 'errorbar' in desc and not desc['errorbar'] else err
                 if not np.isnan(meanval):
                     empty = False
@@ -420,6 +682,7 @@ def plot_bar_chart(resultset, desc, filename, plotdir):
             left += width
         left += separation
     if empty and not plot_empty:
+        plt.close(fig)
         return
     n_bars = len(placement)
     plt.xticks(border + 0.5 * (n_bars * width) +
@@ -448,8 +711,8 @@ def plot_cdf(resultset, desc, filename, plotdir):
 
     Parameters
     ----------
-    rs : ResultSet
-        Result set
+    resultset : ResultSet or SummaryTable
+        Result set, or summary table including the statistics of the plot
     desc : dict
         The plot descriptor (more info below)
     filename : str
@@ -563,16 +826,15 @@ def plot_cdf(resultset, desc, filename, plotdir):
     x_min = np.infty
     x_max = -np.infty
     empty = True
+    summary = _summary(resultset, _cdf_queries(desc))
     for i in range(len(yvals)):
         condition = Tree(desc['filter'])
         if ycondnames is not None:
             condition.setval(ycondnames[i], ycondvals[i])
-        data = [v.getval(ymetrics[i])
-                for _, v in resultset.filter(condition)
-                if v.getval(ymetrics[i]) is not None]
         # If there are more than 1 CDFs in the resultset, take the first one
-        if data:
-            x_cdf, y_cdf = data[0]
+        cdf = summary.get(condition, ymetrics[i], ('FIRST',))
+        if cdf is not None:
+            x_cdf, y_cdf = cdf
             if step:
                 x_cdf, y_cdf = step_cdf(x_cdf, y_cdf)
         else:
@@ -589,6 +851,7 @@ def plot_cdf(resultset, desc, filename, plotdir):
             x_min = min(x_min, x_cdf[0])
             x_max = max(x_max, x_cdf[-1])
     if empty and not plot_empty:
+        plt.close(fig)
         return
     plt.xlim(x_min, x_max)
     if 'legend' in desc:
@@ -600,3 +863,82 @@ def plot_cdf(resultset, desc, filename, plotdir):
     plt.legend(legend, prop={'size': LEGEND_SIZE}, loc=desc['legend_loc'])
     plt.savefig(os.path.join(plotdir, filename), bbox_inches='tight')
     plt.close(fig)
+
+
+# Queries of the statistics drawn by each plot function
+PLOT_QUERIES = {
+    'plot_lines': _mean_queries,
+    'plot_bar_chart': _mean_queries,
+    'plot_cdf': _cdf_queries,
+                }
+
+
+def _render(args):
+    """Draw a plot from its summary table. This function is executed by the
+    processes of the pool drawing plots"""
+    plot, summary, desc, filename, plotdir = args
+    plot(summary, desc, filename, plotdir)
+    return filename
+
+
+def _init_renderer():
+    """Select a non-interactive backend in processes drawing plots"""
+    plt.switch_backend('Agg')
+
+
+def plot_all(results, plots, plotdir, results_format='PICKLE', cache=None,
+             n_proc=None):
+    """Draw a number of plots from the same resultset.
+
+    The statistics of all plots are first computed in a single pass over the
+    resultset, and possibly cached on disk, then plots are drawn in parallel
+    by a pool of processes.
+
+    Parameters
+    ----------
+    results : ResultSet or str
+        The resultset or the path of the file storing it. If a path is
+        given, the resultset is only read if some statistics are not cached
+    plots : list
+        The (plot function, plot descriptor, filename) tuples of the plots
+        to draw. Plot functions are `plot_lines`, `plot_bar_chart` and
+        `plot_cdf`
+    plotdir : str
+        The directory in which plots will be saved
+    results_format : str, optional
+        The format of the results file, if a path is given
+    cache : str, optional
+        The path of the file caching statistics. Cached statistics are only
+        reused if they were computed from the same results file, unchanged
+    n_proc : int, optional
+        The number of processes drawing plots. If not specified, it is equal
+        to the number of CPU cores
+    """
+    if isinstance(results, str):
+        stat = os.stat(results)
+        source = (os.path.abspath(results), stat.st_mtime, stat.st_size)
+    else:
+        source = None
+    summary = SummaryTable.load(cache, source) if cache is not None \
+              else SummaryTable(source)
+    queries = [PLOT_QUERIES[plot.__name__](desc) for plot, desc, _ in plots]
+    missing = [q for plot_queries in queries for q in plot_queries if q not in summary]
+    if missing:
+        if isinstance(results, str):
+            results = RESULTS_READER[results_format](results)
+        n_computed = summary.update(results, missing)
+        logger.info('Computed %d statistics, %d cached', n_computed,
+                    len(summary) - n_computed)
+        if cache is not None:
+            summary.save(cache)
+    else:
+        logger.info('All %d statistics cached', len(summary))
+    args = [(plot, summary.subset(plot_queries), desc, filename, plotdir)
+            for (plot, desc, filename), plot_queries in zip(plots, queries)]
+    pool = mp.Pool(n_proc, initializer=_init_renderer)
+    try:
+        for filename in pool.imap_unordered(_render, args):
+            logger.debug('Saved plot %s', filename)
+    finally:
+        pool.close()
+        pool.join()
@@ -3,6 +3,7 @@
 import collections
 import copy
 import json
+import os
 try:
     import cPickle as pickle
 except ImportError:
@@ -13,8 +14,12 @@ from icarus.registry import register_results_reader, register_results_writer
 
 __all__ = [
     'ResultSet',
+    'ResultsJournal',
+    'iter_results_journal',
     'write_results_pickle',
-    'read_results_pickle'
+    'read_results_pickle',
+    'write_results_journal',
+    'read_results_journal'
            ]
 
 class ResultSet(object):
@@ -176,6 +181,134 @@ class ResultSet(object):
                 filtered_resultset.add(parameters, results)
         return filtered_resultset
 
+    def values(self, path, condition=None):
+        """Return the values of a result of the experiments matching a
+        condition. Experiments without the result are skipped.
+
+        Parameters
+        ----------
+        path : tuple
+            The path of the result in the results tree
+        condition : dict, optional
+            If specified, only experiments matching the condition are
+            considered
+
+        Returns
+        -------
+        values : list
+            The values of the result
+        """
+        resultset = self.filter(condition) if condition else self
+        values = (results.getval(path) for _, results in resultset)
+        return [v for v in values if v is not None]
+
+
+class ResultsJournal(object):
+    """Append-only journal of experiment results.
+
+    Each experiment is appended to the journal as soon as it completes, as a
+    pickled (parameters, results) record flushed to disk, so that the results
+    of a campaign survive a crash of the simulator. A record which was only
+    partially written when the simulator crashed is discarded when the
+    journal is read.
+    """
+
+    def __init__(self, path, resume=False, sync=True):
+        """Constructor
+
+        Parameters
+        ----------
+        path : str
+            The path of the journal file
+        resume : bool, optional
+            If *True*, records are appended to an existing journal, otherwise
+            the journal is truncated
+        sync : bool, optional
+            If *True*, each record is synced to disk as soon as it is
+            appended, otherwise records are only written when the buffer of
+            the journal file is full or the journal is closed
+        """
+        self.path = path
+        self.sync = sync
+        # Offset of the end of the last complete record
+        end = 0
+        if resume and os.path.exists(path):
+            for _, end in self._records():
+                pass
+        self._file = open(path, 'r+b' if resume and os.path.exists(path) else 'wb')
+        # Drop any partially written record at the end of the file
+        self._file.truncate(end)
+        self._file.seek(end)
+
+    def _records(self):
+        """Iterate over the complete records of the journal, yielding each
+        (parameters, results) record and the file offset of its end"""
+        return _journal_records(self.path)
+
+    def append(self, parameters, results):
+        """Append the results of an experiment to the journal
+
+        Parameters
+        ----------
+        parameters : Tree
+            Tree of experiment parameters
+        results : Tree
+            Tree of experiment results
+        """
+        pickle.dump((parameters, results), self._file, pickle.HIGHEST_PROTOCOL)
+        if self.sync:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def read(self):
+        """Read all results stored in the journal
+
+        Returns
+        -------
+        results : ResultSet
+            The result set of all journaled experiments
+        """
+        self._file.flush()
+        results = ResultSet()
+        for record, _ in self._records():
+            results.add(*record)
+        return results
+
+    def close(self):
+        """Close the journal"""
+        self._file.close()
+
+
+def _journal_records(path):
+    """Iterate over the complete records of a journal, yielding each
+    (parameters, results) record and the file offset of its end"""
+    with open(path, 'rb') as journal:
+        while True:
+            try:
+                record = pickle.load(journal)
+            except Exception:
+                # End of file or partially written record
+                return
+            yield record, journal.tell()
+
+
+def iter_results_journal(path):
+    """Iterate over the results stored in a journal without loading them
+    all in memory
+
+    Parameters
+    ----------
+    path : str
+        The path of the journal file
+
+    Returns
+    -------
+    results : iterator
+        Iterator over the (parameters, results) tuples of all journaled
+        experiments
+    """
+    return (record for record, _ in _journal_records(path))
+
 
 @register_results_writer('PICKLE')
 def write_results_pickle(results, path):
@@ -208,3 +341,42 @@ def read_results_pickle(path):
     """
     with open(path, 'rb') as pickle_file:
         return pickle.load(pickle_file)
+
+
+@register_results_writer('JOURNAL')
+def write_results_journal(results, path):
+    """Write a resultset to a journal file
+
+    Parameters
+    ----------
+    results : ResultSet
+        The set of results
+    path : str
+        The path of the file to which write
+    """
+    journal = ResultsJournal(path, sync=False)
+    try:
+        for parameters, result in results:
+            journal.append(parameters, result)
+    finally:
+        journal.close()
+
+
+@register_results_reader('JOURNAL')
+def read_results_journal(path):
+    """Reads a resultset from a journal file.
+
+    Parameters
+    ----------
+    path : str
+        The file path from which results are read
+
+    Returns
+    -------
+    results : ResultSet
+        The read result set
+    """
+    results = ResultSet()
+    for parameters, result in iter_results_journal(path):
+        results.add(parameters, result)
+    return results
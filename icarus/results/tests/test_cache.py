@@ -0,0 +1,47 @@
+import shutil
+import tempfile
+import unittest
+
+from icarus.util import Tree
+from icarus.results import ResultCache
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache = ResultCache(self.dir)
+        self.params_a = Tree({'strategy': {'name': 'LCE'},
+                              'cache_policy': {'name': 'LRU'},
+                              'workload': {'name': 'STATIONARY', 'alpha': 0.8}})
+        self.params_b = Tree({'strategy': {'name': 'LCD'},
+                              'cache_policy': {'name': 'LRU'},
+                              'workload': {'name': 'STATIONARY', 'alpha': 0.8}})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_put_get(self):
+        self.assertEqual([], self.cache.get(self.params_a, ['LATENCY']))
+        self.cache.put(self.params_a, ['LATENCY'], Tree({'LATENCY': {'MEAN': 1}}))
+        self.cache.put(self.params_a, ['LATENCY'], Tree({'LATENCY': {'MEAN': 2}}))
+        results = self.cache.get(self.params_a, ['LATENCY'])
+        self.assertEqual([1, 2], [r['LATENCY']['MEAN'] for r in results])
+        self.assertEqual([], self.cache.get(self.params_b, ['LATENCY']))
+
+    def test_collectors(self):
+        self.cache.put(self.params_a, ['LATENCY'], Tree({'LATENCY': {'MEAN': 1}}))
+        self.assertEqual([], self.cache.get(self.params_a, ['LATENCY', 'CACHE_HIT_RATIO']))
+
+    def test_stale_keys(self):
+        self.cache.put(self.params_a, ['LATENCY'], Tree({'LATENCY': {'MEAN': 1}}))
+        self.assertEqual([], self.cache.stale_keys())
+
+    def test_invalidate(self):
+        self.cache.put(self.params_a, ['LATENCY'], Tree({'LATENCY': {'MEAN': 1}}))
+        self.cache.put(self.params_b, ['LATENCY'], Tree({'LATENCY': {'MEAN': 1}}))
+        self.assertEqual(1, self.cache.invalidate({'strategy': {'name': 'LCD'}}))
+        self.assertEqual(1, len(self.cache.keys()))
+        self.assertEqual([], self.cache.get(self.params_b, ['LATENCY']))
+        self.assertEqual(1, self.cache.invalidate())
+        self.assertEqual([], self.cache.keys())
@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from icarus.results import ResultSet, ColumnarResultSet, \
+                           write_results_columnar, read_results_columnar
+
+
+class TestColumnarResultSet(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rs = ResultSet({'version': 1})
+        for i, alpha in enumerate([0.6, 0.8, 1.0, 0.6]):
+            for strategy in ['LCE', 'LCD']:
+                params = {'workload': {'alpha': alpha, 'ids': [1, 2]},
+                          'strategy': {'name': strategy}}
+                results = {'CACHE_HIT_RATIO': {'MEAN': i / 10.0,
+                                               'PER_NODE': {1: i}},
+                           'LATENCY': {'MEAN': i, 'CDF': ([1, 2], [0.5, 1.0])}}
+                if strategy == 'LCD':
+                    params['strategy']['p'] = 0.5
+                    results['LINK_LOAD'] = {'MEAN': True}
+                cls.rs.add(params, results)
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def assert_same(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for (p1, r1), (p2, r2) in zip(expected, actual):
+            self.assertEqual(p1.paths(), p2.paths())
+            self.assertEqual(r1.paths(), r2.paths())
+
+    def test_roundtrip(self):
+        crs = ColumnarResultSet.from_resultset(self.rs)
+        self.assert_same(self.rs, crs)
+        write_results_columnar(self.rs, self.tmp_dir)
+        read_rs = read_results_columnar(self.tmp_dir)
+        self.assertEqual({'version': 1}, read_rs.attr)
+        self.assert_same(self.rs, read_rs)
+        self.assert_same(self.rs, read_rs.to_resultset())
+        self.assertIsInstance(read_rs[0][1].getval(['LATENCY', 'MEAN']), int)
+        self.assertIsInstance(read_rs[1][1].getval(['LINK_LOAD', 'MEAN']), bool)
+
+    def test_filter(self):
+        write_results_columnar(self.rs, self.tmp_dir)
+        crs = read_results_columnar(self.tmp_dir)
+        for condition in [{'workload': {'alpha': 0.6}},
+                          {'workload': {'alpha': 0.6}, 'strategy': {'name': 'LCD'}},
+                          {'strategy': {'p': 0.5}},
+                          {'strategy': {'p': None}},
+                          {'workload': {'ids': [1, 2]}},
+                          {'workload': {'alpha': 0.7}},
+                          {'topology': {'name': 'PATH'}}]:
+            self.assert_same(self.rs.filter(condition), crs.filter(condition))
+        self.assert_same(self.rs.filter({'strategy': {'name': 'LCD'}}),
+                         crs.filter({'strategy': {'name': 'LCD'}})
+                            .filter({'workload': {'ids': [1, 2]}}))
+
+    def test_values(self):
+        write_results_columnar(self.rs, self.tmp_dir)
+        crs = read_results_columnar(self.tmp_dir)
+        condition = {'workload': {'alpha': 0.6}}
+        for path in [('CACHE_HIT_RATIO', 'MEAN'), ('LATENCY', 'CDF'),
+                     ('LINK_LOAD', 'MEAN'), ('CACHE_HIT_RATIO', 'PER_NODE'),
+                     ('MISSING',)]:
+            self.assertEqual(self.rs.values(path, condition),
+                             crs.values(path, condition))
+        column = crs.column(('LINK_LOAD', 'MEAN'), condition)
+        self.assertTrue(np.isnan(column[0]))
+        self.assertEqual(1, column[1])
+
+    def test_group_by(self):
+        crs = ColumnarResultSet.from_resultset(self.rs)
+        groups = crs.group_by([('workload', 'alpha'), ('strategy', 'name')])
+        self.assertEqual([(0.6, 'LCE'), (0.6, 'LCD'), (0.8, 'LCE'), (0.8, 'LCD'),
+                          (1.0, 'LCE'), (1.0, 'LCD')], list(groups))
+        self.assertEqual([0.0, 0.3], groups[(0.6, 'LCE')].values(('CACHE_HIT_RATIO', 'MEAN')))
+        groups = crs.group_by([('strategy', 'name')], {'workload': {'alpha': 1.0}})
+        self.assertEqual([1], [len(g) for g in groups.values()][:1])
+        self.assertRaises(ValueError, crs.group_by, [('topology', 'name')])
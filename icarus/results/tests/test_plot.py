@@ -0,0 +1,79 @@
+import os
+import shutil
+import tempfile
+import unittest
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from icarus.tools import means_confidence_interval
+from icarus.results import ResultSet, ColumnarResultSet, SummaryTable, \
+                           plot_lines, plot_cdf, plot_all, write_results_pickle
+
+
+class TestSummaryTable(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.rs = ResultSet()
+        for i in range(12):
+            cls.rs.add({'workload': {'alpha': [0.6, 0.8][i % 2]},
+                        'strategy': {'name': ['LCE', 'LCD', 'NO_CACHE'][i % 3]}},
+                       {'CACHE_HIT_RATIO': {'MEAN': i / 12.0},
+                        'LATENCY': {'CDF': ([i], [1.0])}})
+        cls.queries = [({'workload': {'alpha': 0.6}, 'strategy': {'name': 'LCE'}},
+                        ('CACHE_HIT_RATIO', 'MEAN'), ('MEAN', 0.95)),
+                       ({'strategy': {'name': 'LCD'}},
+                        ('CACHE_HIT_RATIO', 'MEAN'), ('MEAN', 0.9)),
+                       ({'strategy': {'name': 'LCD'}},
+                        ('LATENCY', 'CDF'), ('FIRST',)),
+                       ({'strategy': {'name': 'OPTIMAL'}},
+                        ('LATENCY', 'CDF'), ('FIRST',))]
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def expected(self, condition, metric, stat):
+        values = self.rs.values(metric, condition)
+        if stat[0] == 'MEAN':
+            return means_confidence_interval(values, stat[1])
+        return values[0] if values else None
+
+    def test_update(self):
+        for rs in (self.rs, ColumnarResultSet.from_resultset(self.rs)):
+            summary = SummaryTable()
+            self.assertEqual(len(self.queries), summary.update(rs, self.queries))
+            self.assertEqual(0, summary.update(rs, self.queries))
+            for query in self.queries:
+                self.assertIn(query, summary)
+                self.assertEqual(self.expected(*query), summary.get(*query))
+
+    def test_save_load(self):
+        path = os.path.join(self.dir, 'summary.pickle')
+        summary = SummaryTable('a')
+        summary.update(self.rs, self.queries)
+        summary.save(path)
+        self.assertEqual(len(self.queries), len(SummaryTable.load(path, 'a')))
+        self.assertEqual(0, len(SummaryTable.load(path, 'b')))
+
+    def test_plot_all(self):
+        results = os.path.join(self.dir, 'results.pickle')
+        cache = os.path.join(self.dir, 'summary.pickle')
+        write_results_pickle(self.rs, results)
+        desc = {'xparam': ('workload', 'alpha'), 'xvals': [0.6, 0.8],
+                'ymetrics': [('CACHE_HIT_RATIO', 'MEAN')] * 2,
+                'ycondnames': [('strategy', 'name')] * 2,
+                'ycondvals': ['LCE', 'LCD']}
+        cdf_desc = {'ymetrics': [('LATENCY', 'CDF')],
+                    'ycondnames': [('strategy', 'name')],
+                    'ycondvals': ['LCE'], 'legend_loc': 'best'}
+        plots = [(plot_lines, desc, 'lines.png'), (plot_cdf, cdf_desc, 'cdf.png')]
+        plot_all(results, plots, self.dir, cache=cache, n_proc=1)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'lines.png')))
+        self.assertTrue(os.path.exists(os.path.join(self.dir, 'cdf.png')))
+        with open(cache, 'rb') as f:
+            self.assertEqual(5, len(pickle.load(f)))
@@ -1,6 +1,10 @@
+import os
+import shutil
+import tempfile
 import unittest
 
-from icarus.results import ResultSet
+from icarus.results import ResultSet, ResultsJournal, iter_results_journal, \
+                           write_results_journal, read_results_journal
 
 class TestResultSet(unittest.TestCase):
 
@@ -54,3 +58,63 @@ class TestResultSet(unittest.TestCase):
         rs.add(a, b)
         rs.add(b, a)
         self.assertEqual([[a, b], [b, a]], eval(rs.json()))
+
+
+class TestResultsJournal(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'results.journal')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_append_read(self):
+        journal = ResultsJournal(self.path)
+        journal.append({'alpha': 1}, {'m1': 1})
+        journal.append({'alpha': 2}, {'m1': 2})
+        rs = journal.read()
+        journal.close()
+        self.assertEqual(2, len(rs))
+        self.assertEqual({'alpha': 2}, rs[1][0])
+        self.assertEqual({'m1': 2}, rs[1][1])
+
+    def test_resume(self):
+        journal = ResultsJournal(self.path)
+        journal.append({'alpha': 1}, {'m1': 1})
+        journal.close()
+        journal = ResultsJournal(self.path, resume=True)
+        journal.append({'alpha': 2}, {'m1': 2})
+        self.assertEqual(2, len(journal.read()))
+        journal.close()
+
+    def test_no_resume_truncates(self):
+        journal = ResultsJournal(self.path)
+        journal.append({'alpha': 1}, {'m1': 1})
+        journal.close()
+        journal = ResultsJournal(self.path)
+        self.assertEqual(0, len(journal.read()))
+        journal.close()
+
+    def test_resume_partial_record(self):
+        journal = ResultsJournal(self.path)
+        journal.append({'alpha': 1}, {'m1': 1})
+        journal.append({'alpha': 2}, {'m1': 2})
+        journal.close()
+        # Simulate a crash while the last record was being written
+        size = os.path.getsize(self.path)
+        with open(self.path, 'r+b') as f:
+            f.truncate(size - 3)
+        journal = ResultsJournal(self.path, resume=True)
+        journal.append({'alpha': 3}, {'m1': 3})
+        rs = journal.read()
+        journal.close()
+        self.assertEqual([{'alpha': 1}, {'alpha': 3}], [p for p, _ in rs])
+
+    def test_write_read_journal(self):
+        rs = ResultSet()
+        rs.add({'alpha': 1}, {'m1': 1})
+        rs.add({'alpha': 2}, {'m1': 2})
+        write_results_journal(rs, self.path)
+        self.assertEqual(rs.dump(), read_results_journal(self.path).dump())
+        self.assertEqual(rs.dump(), list(iter_results_journal(self.path)))
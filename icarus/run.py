@@ -58,6 +58,13 @@ def _validate_settings(settings, freeze=True):
             settings.N_PROCESSES = n_proc
             logger.warning('N_PROCESSES setting not specified. Set to %s'
                          % str(n_proc))
+    if 'DISTRIBUTED_EXECUTION' in settings and settings.DISTRIBUTED_EXECUTION:
+        if 'COORDINATOR_ADDRESS' not in settings:
+            logger.error('No COORDINATOR_ADDRESS setting found. Exiting')
+            sys.exit(-1)
+        if 'COORDINATOR_AUTHKEY' not in settings:
+            logger.error('No COORDINATOR_AUTHKEY setting found. Exiting')
+            sys.exit(-1)
     if 'N_REPLICATIONS' not in settings:
         n_replications = 1
         settings.N_REPLICATIONS = n_replications
@@ -77,11 +84,15 @@ def _validate_settings(settings, freeze=True):
         settings.freeze()
 
 
-def run(config_file, output, config_override):
+def run(config_file, output, config_override, resume=False):
     """
     Run function. It starts the simulator.
     experiments
 
+    Results of each experiment are also appended, as soon as the experiment
+    completes, to a journal file named after the output file with a
+    *.journal* suffix.
+
     Parameters
     ----------
     config : str
@@ -90,6 +101,9 @@ def run(config_file, output, config_override):
         The file name where results will be saved
     config_override : dict, optional
         Configuration parameters overriding parameters in the file
+    resume : bool, optional
+        If *True*, resume an interrupted campaign, executing only the
+        experiments whose results are not in the journal
     """
     # Read settings from file and save them in icarus.conf.settings
     settings = Settings()
@@ -106,7 +120,11 @@ def run(config_file, output, config_override):
     # Validate settings
     _validate_settings(settings, freeze=True)
     # set up orchestration
-    orch = Orchestrator(settings)
+    journal = output + '.journal'
+    if resume and not os.path.exists(journal):
+        logger.warning('No results journal %s found. Starting campaign from scratch'
+                       % os.path.abspath(journal))
+    orch = Orchestrator(settings, journal=journal, resume=resume)
     for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP, signal.SIGQUIT, signal.SIGABRT):
         signal.signal(sig, functools.partial(handler, settings, orch, output))
     logger.info('Launching orchestrator')
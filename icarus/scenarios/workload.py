@@ -17,6 +17,11 @@ following attributes:
 
 Each workload must expose the `contents` attribute which is an iterable of
 all content identifiers. This is needed for content placement.
+
+Workloads whose iteration state is entirely stored in the workload object, so
+that iterating over a pickled copy of the workload resumes the iteration where
+it was interrupted, must set the `resumable` attribute to *True*. Only these
+workloads support checkpointing of in-flight experiments.
 """
 import random
 import csv
@@ -24,7 +29,7 @@ import csv
 import networkx as nx
 import heapq 
 
-from icarus.tools import TruncatedZipfDist
+from icarus.tools import TruncatedZipfDist, MserWarmupDetector
 from icarus.registry import register_workload
 
 __all__ = [
@@ -72,9 +77,16 @@ class StationaryWorkload(object):
         The mean rate of requests per second
     n_warmup : int, optional
         The number of warmup requests (i.e. requests executed to fill cache but
-        not logged)
+        not logged). If *auto_warmup* is *True*, this is the maximum number of
+        warmup requests
     n_measured : int, optional
         The number of logged requests after the warmup
+    auto_warmup : bool, optional
+        If *True*, the end of the warmup is detected automatically by applying
+        the MSER-5 rule to the deadline satisfaction of warmup requests
+    min_warmup : int, optional
+        The minimum number of warmup requests observed before the end of the
+        warmup can be detected. This is ignored if *auto_warmup* is *False*
 
     Returns
     -------
@@ -83,8 +95,13 @@ class StationaryWorkload(object):
         the timestamp at which the event occurs and the second element is a
         dictionary of event attributes.
     """
+
+    # The iteration over this workload can be resumed from a pickled copy
+    resumable = True
+
     def __init__(self, topology, n_contents, alpha, beta=0, rate=1.0,
-                    n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=0, n_services=10, **kwargs):
+                    n_warmup=10 ** 5, n_measured=4 * 10 ** 5, seed=0, n_services=10,
+                    auto_warmup=False, min_warmup=1000, **kwargs):
         if alpha < 0:
             raise ValueError('alpha must be positive')
         if beta < 0:
@@ -99,6 +116,15 @@ class StationaryWorkload(object):
         self.rate = rate
         self.n_warmup = n_warmup
         self.n_measured = n_measured
+        # Detector of the end of the warmup, if automatic detection is enabled.
+        # The number of warmup requests actually executed is stored in
+        # warmup_end as soon as it is known.
+        if auto_warmup:
+            self.warmup_detector = MserWarmupDetector(min_observations=min_warmup)
+            self.warmup_end = None
+        else:
+            self.warmup_detector = None
+            self.warmup_end = n_warmup
         self.model = None
         self.beta = beta
         self.topology = topology
@@ -109,30 +135,53 @@ class StationaryWorkload(object):
         
         self.seed = seed
         self.first = True
-        
-    def __iter__(self):
-        req_counter = 0
-        t_event = 0.0
-        flow_id = 0
+        # State of the iteration
+        self.req_counter = 0
+        self.flow_id = 0
+        self.t_event = 0.0
+        self.t_event_drawn = False
+
+    def _log(self, req_counter):
+        """Return whether the request with the given sequence number must be
+        logged, detecting the end of the warmup if needed"""
+        if self.warmup_end is None and (self.warmup_detector.warmed_up
+                                        or req_counter >= self.n_warmup):
+            self.warmup_end = req_counter
+        return self.warmup_end is not None and req_counter >= self.warmup_end
+
+    def _n_requests(self):
+        """Return the total number of requests to generate"""
+        n_warmup = self.warmup_end if self.warmup_end is not None else self.n_warmup
+        return n_warmup + self.n_measured
 
+    def __iter__(self):
+        # The state of the iteration is stored in the workload object rather
+        # than in local variables, so that a pickled workload can resume the
+        # iteration from where it was interrupted (see the resumable
+        # attribute)
+        resume = self.req_counter > 0
         if self.first: #TODO remove this first variable, this is not necessary here
             random.seed(self.seed)
             self.first=False
-        aFile = open('workload.txt', 'w')
-        aFile.write("# Time\tNodeID\tserviceID\n")
-        eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
-        while req_counter < self.n_warmup + self.n_measured or len(self.model.eventQ) > 0:
-            t_event += (random.expovariate(self.rate))
+        aFile = open('workload.txt', 'a' if resume else 'w')
+        if not resume:
+            aFile.write("# Time\tNodeID\tserviceID\n")
+        while self.req_counter < self._n_requests() or len(self.model.eventQ) > 0:
+            if not self.t_event_drawn:
+                self.t_event += (random.expovariate(self.rate))
+                self.t_event_drawn = True
+            t_event = self.t_event
 
             eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
             while eventObj is not None and eventObj.time < t_event:
                 heapq.heappop(self.model.eventQ)
-                log = (req_counter >= self.n_warmup)
+                log = self.warmup_end is not None and self.req_counter >= self.warmup_end
                 event = {'receiver' : eventObj.receiver, 'content': eventObj.service, 'log' : log, 'node' : eventObj.node, 'flow_id' : eventObj.flow_id, 'deadline' : eventObj.deadline, 'response' : eventObj.response}
                 yield (eventObj.time, event)
                 eventObj = self.model.eventQ[0] if len(self.model.eventQ) > 0 else None
+            self.t_event_drawn = False
 
-            if req_counter >= (self.n_warmup + self.n_measured):
+            if self.req_counter >= self._n_requests():
                 # skip below if we already sent all the requests
                 continue
 
@@ -142,15 +191,15 @@ class StationaryWorkload(object):
                 receiver = self.receivers[self.receiver_dist.rv() - 1]
             node = receiver
             content = int(self.zipf.rv())
-            log = (req_counter >= self.n_warmup)
-            flow_id += 1
+            log = self._log(self.req_counter)
+            self.flow_id += 1
+            self.req_counter += 1
             deadline = self.model.services[content].deadline + t_event
-            event = {'receiver': receiver, 'content' : content, 'log' : log, 'node' : node ,'flow_id': flow_id, 'deadline': deadline, 'response' : False}
+            event = {'receiver': receiver, 'content' : content, 'log' : log, 'node' : node ,'flow_id': self.flow_id, 'deadline': deadline, 'response' : False}
             neighbors = self.topology.neighbors(receiver)
             s = str(t_event) + "\t" + str(neighbors[0]) + "\t" + str(content) + "\n"
             aFile.write(s)
             yield (t_event, event)
-            req_counter += 1
         
         print "End of iteration: len(eventObj): " + repr(len(self.model.eventQ))
         aFile.close()
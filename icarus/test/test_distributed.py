@@ -0,0 +1,41 @@
+import os
+import shutil
+import tempfile
+import operator
+import unittest
+import multiprocessing as mp
+
+from icarus.distributed import Coordinator, run_worker
+
+
+class TestCoordinator(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.address = os.path.join(self.dir, 'coordinator.sock')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_run(self):
+        results = []
+        coordinator = Coordinator(self.address, 'key')
+        for i in range(10):
+            coordinator.submit(operator.mul, (i, 2), results.append)
+        worker = mp.Process(target=run_worker, args=(self.address, 'key', 2, 1))
+        worker.start()
+        coordinator.run()
+        worker.join()
+        self.assertEqual([2 * i for i in range(10)], sorted(results))
+        self.assertFalse(worker.exitcode)
+
+    def test_failed_job(self):
+        results = []
+        coordinator = Coordinator(self.address, 'key')
+        coordinator.submit(operator.div, (1, 0), results.append)
+        coordinator.submit(operator.div, (4, 2), results.append)
+        worker = mp.Process(target=run_worker, args=(self.address, 'key', 1, 1))
+        worker.start()
+        coordinator.run()
+        worker.join()
+        self.assertEqual([None, 2], results)
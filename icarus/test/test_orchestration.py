@@ -0,0 +1,79 @@
+import unittest
+
+from icarus.util import Tree
+from icarus.registry import TOPOLOGY_FACTORY
+from icarus.orchestration import group_by_scenario, CostModel, utilisation_report
+
+
+class TestGroupByScenario(unittest.TestCase):
+
+    def experiment(self, alpha, strategy):
+        return Tree({'workload': {'name': 'STATIONARY', 'alpha': alpha},
+                     'strategy': {'name': strategy},
+                     'desc': "%s %s" % (str(alpha), strategy)})
+
+    def test_group(self):
+        experiments = [self.experiment(0.6, 'LCE'),
+                       self.experiment(0.8, 'LCE'),
+                       self.experiment(0.6, 'LCD'),
+                       self.experiment(0.8, 'LCD'),
+                       self.experiment(1.0, 'LCD')]
+        groups = group_by_scenario(experiments)
+        self.assertEqual(3, len(groups))
+        self.assertEqual([experiments[0], experiments[2]], groups[0])
+        self.assertEqual([experiments[1], experiments[3]], groups[1])
+        self.assertEqual([experiments[4]], groups[2])
+
+    def test_group_does_not_modify_experiments(self):
+        experiment = self.experiment(0.6, 'LCE')
+        group_by_scenario([experiment])
+        self.assertIn('strategy', experiment)
+        self.assertIn('desc', experiment)
+
+
+class TestCostModel(unittest.TestCase):
+
+    def experiment(self, n_measured, k, strategy):
+        return Tree({'workload': {'name': 'STATIONARY', 'n_warmup': 0,
+                                  'n_measured': n_measured},
+                     'topology': {'name': 'TREE', 'k': k, 'h': 2},
+                     'strategy': {'name': strategy}})
+
+    def test_work(self):
+        model = CostModel({'SDF': 2})
+        n_nodes = TOPOLOGY_FACTORY['TREE'](k=2, h=2).number_of_nodes()
+        self.assertEqual(100 * n_nodes, model.work(self.experiment(100, 2, 'MFU')))
+        self.assertEqual(200 * n_nodes, model.work(self.experiment(100, 2, 'SDF')))
+
+    def test_cost_ordering(self):
+        model = CostModel()
+        small = self.experiment(100, 2, 'MFU')
+        large = self.experiment(100, 3, 'MFU')
+        self.assertGreater(model.cost(large), model.cost(small))
+
+    def test_observe(self):
+        model = CostModel()
+        exp_a = self.experiment(100, 2, 'MFU')
+        exp_b = self.experiment(200, 2, 'MFU')
+        model.observe(exp_a, 7.0)
+        model.observe(exp_a, 9.0)
+        self.assertAlmostEqual(8.0, model.cost(exp_a))
+        # Experiment b requires twice the work of experiment a
+        self.assertAlmostEqual(16.0, model.cost(exp_b))
+        # No SDF experiment observed: use the rate of all experiments
+        self.assertAlmostEqual(16.0, model.cost(self.experiment(200, 2, 'SDF')))
+
+
+class TestUtilisationReport(unittest.TestCase):
+
+    def test_full_utilisation(self):
+        report = utilisation_report([(0, 10), (0, 10)], 2)
+        self.assertAlmostEqual(10, report['makespan'])
+        self.assertAlmostEqual(1, report['utilisation'])
+
+    def test_tail(self):
+        report = utilisation_report([(0, 4), (0, 6), (4, 10)], 2)
+        self.assertAlmostEqual(10, report['makespan'])
+        self.assertAlmostEqual(0.8, report['utilisation'])
+        self.assertAlmostEqual(6, report['tail'])
+        self.assertAlmostEqual(8 / 12., report['tail_utilisation'])
@@ -244,3 +244,12 @@ class TestTree(unittest.TestCase):
     def test_match_empty_tree(self):
         tree = Tree()
         self.assertFalse(tree.match({'a': 1}))
+
+    def test_digest(self):
+        tree_1 = Tree()
+        tree_1['a']['b'] = 1
+        tree_1['c'] = [1, 2]
+        tree_2 = Tree({'c': [1, 2], 'a': {'b': 1}})
+        self.assertEqual(tree_1.digest(), tree_2.digest())
+        tree_2['a']['b'] = 2
+        self.assertNotEqual(tree_1.digest(), tree_2.digest())
@@ -13,7 +13,9 @@ import scipy.stats as ss
 __all__ = [
        'DiscreteDist',
        'TruncatedZipfDist',
+       'MserWarmupDetector',
        'means_confidence_interval',
+       'mser',
        'proportions_confidence_interval',
        'cdf',
        'pdf',
@@ -123,6 +125,165 @@ class TruncatedZipfDist(DiscreteDist):
         return self._alpha
 
 
+class MserWarmupDetector(object):
+    """Online detector of the end of the initial transient of a simulation
+    based on the MSER-5 truncation rule.
+
+    Observations (e.g. per-request satisfaction) are fed one at a time and
+    grouped in batches of *batch_size*. Every *check_interval* batches the
+    MSER statistic is evaluated over all batch means collected so far. The
+    warm-up is considered over as soon as the optimal truncation point lies
+    in the first half of the buffered data, which is the standard acceptance
+    condition of MSER.
+    """
+
+    def __init__(self, batch_size=5, min_observations=100, check_interval=10):
+        """Constructor
+
+        Parameters
+        ----------
+        batch_size : int, optional
+            Number of observations averaged in each batch
+        min_observations : int, optional
+            Minimum number of observations to collect before testing for the
+            end of the warm-up
+        check_interval : int, optional
+            Number of batches collected between two consecutive tests
+        """
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        if min_observations < 0:
+            raise ValueError('min_observations must be non-negative')
+        if check_interval < 1:
+            raise ValueError('check_interval must be positive')
+        self.batch_size = batch_size
+        # The last two batches are never candidate truncation points, hence at
+        # least three batches are needed to test for the end of the warm-up
+        self.min_batches = max(3, min_observations // batch_size)
+        self.check_interval = check_interval
+        self._batch_sum = 0.0
+        self._batch_len = 0
+        self._batches = []
+        self._warmed_up = False
+        self._truncation_point = None
+
+    @property
+    def warmed_up(self):
+        """Return *True* if the end of the warm-up has been detected"""
+        return self._warmed_up
+
+    @property
+    def n_observations(self):
+        """Return the number of observations collected so far"""
+        return len(self._batches) * self.batch_size + self._batch_len
+
+    @property
+    def truncation_point(self):
+        """Return the optimal truncation point (in number of observations)
+        selected by MSER or *None* if the warm-up has not been detected yet
+        """
+        return self._truncation_point
+
+    def add(self, value):
+        """Add an observation
+
+        Observations added after the end of the warm-up has been detected are
+        ignored.
+
+        Parameters
+        ----------
+        value : float
+            The observed value
+
+        Returns
+        -------
+        warmed_up : bool
+            *True* if the end of the warm-up has been detected
+        """
+        if self._warmed_up:
+            return True
+        self._batch_sum += value
+        self._batch_len += 1
+        if self._batch_len < self.batch_size:
+            return False
+        self._batches.append(self._batch_sum / self.batch_size)
+        self._batch_sum = 0.0
+        self._batch_len = 0
+        n = len(self._batches)
+        if n >= self.min_batches and n % self.check_interval == 0:
+            # The last batches are excluded because the MSER statistic is
+            # unreliable when computed over very few samples
+            stat = _mser_statistic(self._batches)
+            d = int(np.argmin(stat[:n - max(2, n // 10)]))
+            if d <= n // 2:
+                self._warmed_up = True
+                self._truncation_point = d * self.batch_size
+        return self._warmed_up
+
+
+def _mser_statistic(batches):
+    """Return the MSER statistic of a sequence of batch means for all possible
+    truncation points
+
+    Parameters
+    ----------
+    batches : array-like
+        Batch means
+
+    Returns
+    -------
+    stat : array
+        Array whose element *d* is the MSER statistic obtained when truncating
+        the first *d* batches
+    """
+    batches = np.asarray(batches, dtype=float)
+    n = len(batches)
+    # Sums and sums of squares of all suffixes of the series, i.e. of the
+    # series truncated at each possible point
+    tail_sum = np.cumsum(batches[::-1])[::-1]
+    tail_sq_sum = np.cumsum(batches[::-1] ** 2)[::-1]
+    tail_len = np.arange(n, 0, -1, dtype=float)
+    sq_dev = np.maximum(tail_sq_sum - tail_sum ** 2 / tail_len, 0)
+    return sq_dev / tail_len ** 2
+
+
+def mser(data, batch_size=5):
+    """Compute the optimal truncation point of a time series according to the
+    Marginal Standard Error Rule (MSER).
+
+    The data is first grouped in batches of *batch_size* observations (with
+    the default batch size this is the MSER-5 variant). The truncation point
+    is the one minimizing the marginal standard error of the batch means
+    among all truncation points in the first half of the series.
+
+    Parameters
+    ----------
+    data : array-like
+        The time series
+    batch_size : int, optional
+        The number of observations in each batch
+
+    Returns
+    -------
+    truncation_point : int
+        The number of initial observations to discard
+
+    References
+    ----------
+    [1] K. P. White Jr., An effective truncation heuristic for bias reduction
+        in simulation output, Simulation, 69(6), 1997
+    """
+    if batch_size < 1:
+        raise ValueError('batch_size must be positive')
+    data = np.asarray(data, dtype=float)
+    n_batches = len(data) // batch_size
+    if n_batches < 2:
+        raise ValueError('data must contain at least two batches')
+    batches = data[:n_batches * batch_size].reshape(n_batches, batch_size).mean(axis=1)
+    stat = _mser_statistic(batches)
+    return int(np.argmin(stat[:n_batches // 2 + 1])) * batch_size
+
+
 def means_confidence_interval(data, confidence=0.95):
     """Computes the confidence interval for a given set of means.
 
@@ -77,3 +77,55 @@ class TestCdf(unittest.TestCase):
             self.assertAlmostEqual(x[i], exp_x[i])
             self.assertAlmostEqual(cdf[i], exp_cdf[i])
 
+
+
+class TestMser(unittest.TestCase):
+
+    def test_stationary(self):
+        data = np.ones(1000)
+        self.assertEqual(0, stats.mser(data))
+
+    def test_transient(self):
+        data = np.concatenate([np.linspace(0, 1, 200), np.ones(800)])
+        d = stats.mser(data)
+        self.assertGreater(d, 150)
+        self.assertLessEqual(d, 200)
+
+    def test_batch_size(self):
+        data = np.concatenate([np.zeros(100), np.ones(900)])
+        self.assertEqual(100, stats.mser(data, batch_size=10))
+
+    def test_too_few_data(self):
+        self.assertRaises(ValueError, stats.mser, [1, 2, 3], 5)
+
+
+class TestMserWarmupDetector(unittest.TestCase):
+
+    def test_stationary(self):
+        detector = stats.MserWarmupDetector(min_observations=100)
+        for _ in range(99):
+            self.assertFalse(detector.add(1.0))
+        self.assertIsNone(detector.truncation_point)
+        self.assertTrue(detector.add(1.0))
+        self.assertTrue(detector.warmed_up)
+        self.assertEqual(0, detector.truncation_point)
+
+    def test_transient(self):
+        detector = stats.MserWarmupDetector(min_observations=100)
+        data = np.concatenate([np.linspace(0, 1, 500), np.ones(2000)])
+        for i, x in enumerate(data):
+            if detector.add(x):
+                break
+        self.assertTrue(detector.warmed_up)
+        self.assertGreater(i, 500)
+        self.assertGreater(detector.truncation_point, 400)
+        self.assertLessEqual(detector.truncation_point, 500)
+
+    def test_ignore_after_warmup(self):
+        detector = stats.MserWarmupDetector(min_observations=10, check_interval=1)
+        for _ in range(15):
+            detector.add(1.0)
+        self.assertTrue(detector.warmed_up)
+        n = detector.n_observations
+        detector.add(0.0)
+        self.assertEqual(n, detector.n_observations)
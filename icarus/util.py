@@ -6,6 +6,7 @@ import logging
 import collections
 import copy
 import heapq
+import hashlib
 
 import numpy as np
 import networkx as nx
@@ -185,6 +186,21 @@ class Tree(collections.defaultdict):
             d[k] = v
         return d
 
+    def digest(self):
+        """Return a hash of the content of the tree.
+
+        Unlike the built-in hash function, the digest does not depend on the
+        insertion order of the keys and is stable across processes and
+        interpreter sessions, hence it can be used to identify experiments
+        from their parameters trees.
+
+        Returns
+        -------
+        digest : str
+            Hexadecimal MD5 digest of a canonical representation of the tree
+        """
+        return hashlib.md5(repr(sorted(self.paths().items()))).hexdigest()
+
     def match(self, condition):
         """Check if the tree matches a given condition.
 
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""Convert a resultset from a format to another, e.g. from a pickle file to
+a columnar directory.
+
+Usage:
+    python convertresults.py [-i PICKLE] [-o COLUMNAR] <input> <output>
+"""
+import argparse
+from icarus.registry import RESULTS_READER, RESULTS_WRITER
+
+__all__ = ['convert_results']
+
+
+def convert_results(input, output, input_format='PICKLE', output_format='COLUMNAR'):
+    """Convert a resultset from a format to another
+
+    Parameters
+    ----------
+    input : str
+        The path of the resultset to convert
+    output : str
+        The path of the converted resultset
+    input_format : str, optional
+        The format of the resultset to convert
+    output_format : str, optional
+        The format of the converted resultset
+    """
+    RESULTS_WRITER[output_format](RESULTS_READER[input_format](input), output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-i", "--input-format", dest="input_format", default='PICKLE',
+                        choices=sorted(RESULTS_READER), help="format of the input")
+    parser.add_argument("-o", "--output-format", dest="output_format", default='COLUMNAR',
+                        choices=sorted(RESULTS_WRITER), help="format of the output")
+    parser.add_argument("input", help="The resultset to convert")
+    parser.add_argument("output", help="The converted resultset")
+    args = parser.parse_args()
+    convert_results(args.input, args.output, args.input_format, args.output_format)
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,236 @@
 #!/usr/bin/env python
-"""This script merges a number of resultsets saved in pickle format into a 
-single pickle file.
+"""This script merges a number of resultsets into a single resultset.
+
+Input resultsets are read one at a time, or in parallel by a pool of
+processes, and experiments are added to the output as they are read, without
+building intermediate resultsets. Experiments appearing in more than one
+input, with the same parameters and results, are only included once.
+
+If requested, the replications of each experiment are aggregated while they
+are read: each numeric result of the output is the mean of that result over
+all replications and the AGGREGATE subtree of the output stores the number of
+replications (N_REPLICATIONS), the confidence level (CONFIDENCE) and the
+confidence interval half-width of each mean (ERR). Only running statistics of
+each experiment are kept in memory, and non-numeric results are discarded.
 """
+from __future__ import division
+import math
+import numbers
+import hashlib
 import argparse
+import collections
+import multiprocessing as mp
+
+import scipy.stats as ss
+
+from icarus.util import Tree
 from icarus.registry import RESULTS_READER, RESULTS_WRITER
+from icarus.results import ResultSet, ResultsJournal, iter_results_journal
+
+__all__ = ['merge_results', 'ReplicationAggregator']
+
+
+def _read(path, input_format):
+    """Return the global attributes of a resultset, if any, and an iterator
+    over its (parameters, results) tuples. Journals are read lazily"""
+    if input_format == 'JOURNAL':
+        return None, iter_results_journal(path)
+    resultset = RESULTS_READER[input_format](path)
+    return resultset.attr, iter(resultset)
 
-__all__ = ['merge_results']
 
-read = RESULTS_READER['PICKLE']
-write = RESULTS_WRITER['PICKLE']
+def _digest(parameters, results):
+    """Return a digest identifying an experiment from its parameters and
+    results"""
+    return hashlib.md5(Tree(parameters).digest() + Tree(results).digest()).hexdigest()
+
+
+def _read_digested(args):
+    """Read a resultset and compute the digest of each experiment. This
+    function is executed by the processes reading inputs in parallel"""
+    path, input_format = args
+    attr, records = _read(path, input_format)
+    return attr, [(_digest(p, r), p, r) for p, r in records]
+
+
+class ReplicationAggregator(object):
+    """Compute the mean and confidence interval of the numeric results of
+    each experiment over its replications, one replication at a time.
+
+    Means and variances are updated with Welford's algorithm and confidence
+    intervals are computed as in `icarus.tools.means_confidence_interval`.
+    """
+
+    def __init__(self, confidence=0.95):
+        """Constructor
+
+        Parameters
+        ----------
+        confidence : float, optional
+            The confidence level of the intervals
+        """
+        self.confidence = confidence
+        # Parameters, number of replications and (count, mean, sum of squared
+        # deviations) of each result, keyed by digest of the parameters
+        self._experiments = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._experiments)
+
+    def add(self, parameters, results):
+        """Add a replication of an experiment
+
+        Parameters
+        ----------
+        parameters : Tree
+            Tree of experiment parameters
+        results : Tree
+            Tree of experiment results
+        """
+        key = Tree(parameters).digest()
+        if key not in self._experiments:
+            self._experiments[key] = [parameters, 0, {}]
+        entry = self._experiments[key]
+        entry[1] += 1
+        for path, value in Tree(results).paths().items():
+            if isinstance(value, bool) or not isinstance(value, numbers.Real):
+                continue
+            stats = entry[2].setdefault(path, [0, 0.0, 0.0])
+            stats[0] += 1
+            delta = value - stats[1]
+            stats[1] += delta / stats[0]
+            stats[2] += delta * (value - stats[1])
+
+    def results(self):
+        """Return the aggregated results of each experiment
+
+        Returns
+        -------
+        results : iterator
+            Iterator over the (parameters, results) tuples of each
+            experiment, in order of first replication
+        """
+        z = ss.norm.interval(self.confidence)[1]
+        for parameters, n, stats in self._experiments.values():
+            results = Tree()
+            err = Tree()
+            for path, (count, mean, m2) in stats.items():
+                results.setval(path, mean)
+                err.setval(path, z * math.sqrt(m2 / count) / math.sqrt(count))
+            results['AGGREGATE'] = Tree({'N_REPLICATIONS': n,
+                                         'CONFIDENCE': self.confidence,
+                                         'ERR': err})
+            yield parameters, results
+
+
+def merge_results(inputs, output, input_format='PICKLE', output_format='PICKLE',
+                  aggregate=False, confidence=0.95, n_proc=1):
+    """Merge a list of resultsets into a single resultset.
 
-def merge_results(inputs, output):
-    """Merge a list of resultsets, saved as pickle into a single pickle file.
-    
     If output file exists, it is overwritten.
-    
+
     Parameters
     ----------
-    input : list
-        List of all pickle file names of the input resultsets
+    inputs : list
+        List of all file names of the input resultsets
     output : str
-        File name of the output pickle file
+        File name of the output resultset
+    input_format : str, optional
+        The format of the input resultsets
+    output_format : str, optional
+        The format of the output resultset. If JOURNAL, experiments are
+        written to the output as soon as they are read
+    aggregate : bool, optional
+        If True, aggregate the replications of each experiment
+    confidence : float, optional
+        The confidence level of the intervals of aggregated results
+    n_proc : int, optional
+        The number of processes reading inputs in parallel
+
+    Returns
+    -------
+    n_merged : int
+        The number of experiments written to the output
+    n_duplicates : int
+        The number of duplicate experiments discarded
     """
-    write(sum((read(i) for i in inputs[1:]), read(inputs[0])), output)
+    if n_proc > 1:
+        pool = mp.Pool(n_proc)
+        # Inputs are read in order, at most n_proc at a time
+        shards = pool.imap(_read_digested, [(i, input_format) for i in inputs])
+    else:
+        pool = None
+        shards = (_read(i, input_format) for i in inputs)
+    attr = None
+    seen = set()
+    n_duplicates = 0
+    aggregator = ReplicationAggregator(confidence) if aggregate else None
+    journal = ResultsJournal(output, sync=False) \
+              if output_format == 'JOURNAL' and not aggregate else None
+    resultset = ResultSet()
+    try:
+        for shard_attr, records in shards:
+            if shard_attr is not None:
+                if attr is not None and attr != shard_attr:
+                    raise ValueError('The resultsets cannot be merged because '
+                                     'they have different global attributes')
+                attr = shard_attr
+            for record in records:
+                digest, parameters, results = record if pool is not None \
+                                              else (_digest(*record),) + tuple(record)
+                if digest in seen:
+                    n_duplicates += 1
+                    continue
+                seen.add(digest)
+                if aggregator is not None:
+                    aggregator.add(parameters, results)
+                elif journal is not None:
+                    journal.append(parameters, results)
+                else:
+                    resultset.add(parameters, results)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        if journal is not None:
+            journal.close()
+    if journal is not None:
+        return len(seen), n_duplicates
+    if attr is not None:
+        resultset.attr = attr
+    if aggregator is not None:
+        if output_format == 'JOURNAL':
+            RESULTS_WRITER[output_format](aggregator.results(), output)
+            return len(aggregator), n_duplicates
+        for parameters, results in aggregator.results():
+            resultset.add(parameters, results)
+    RESULTS_WRITER[output_format](resultset, output)
+    return len(resultset), n_duplicates
+
 
 def main():
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("-o", "--output", dest="output",
                         help='The output results file',
                         required=True)
+    parser.add_argument("-i", "--input-format", dest="input_format", default='PICKLE',
+                        choices=sorted(RESULTS_READER), help="format of the inputs")
+    parser.add_argument("-f", "--output-format", dest="output_format", default='PICKLE',
+                        choices=sorted(RESULTS_WRITER), help="format of the output")
+    parser.add_argument("-a", "--aggregate", dest="aggregate", action="store_true",
+                        help="aggregate the replications of each experiment")
+    parser.add_argument("-c", "--confidence", dest="confidence", type=float,
+                        default=0.95, help="confidence level of aggregated results")
+    parser.add_argument("-j", "--processes", dest="n_proc", type=int, default=1,
+                        help="number of processes reading inputs in parallel")
     parser.add_argument("inputs",
-                        help="The simulation configuration file", nargs="+")
+                        help="The simulation results files", nargs="+")
     args = parser.parse_args()
-    merge_results(args.inputs, args.output)
+    n_merged, n_duplicates = merge_results(args.inputs, args.output,
+                                           args.input_format, args.output_format,
+                                           args.aggregate, args.confidence, args.n_proc)
+    print("Merged %d experiments from %d resultsets, %d duplicates discarded"
+          % (n_merged, len(args.inputs), n_duplicates))
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+"""Inspect and invalidate a cache of experiment results.
+
+Usage:
+    python resultcache.py <cache-dir> list [--stale]
+    python resultcache.py <cache-dir> invalidate (--all | --stale | -m PATH=VALUE ...)
+
+Conditions of the invalidate command are expressed as the dot-separated path
+of a parameter and its value, e.g. strategy.name=LCE
+"""
+import time
+import argparse
+from icarus.results import ResultCache
+
+__all__ = ['list_entries', 'invalidate_entries']
+
+
+def _condition(matches):
+    """Build a condition for ResultCache.invalidate from a list of
+    PATH=VALUE strings"""
+    condition = {}
+    for match in matches:
+        path, value = match.split('=', 1)
+        try:
+            value = eval(value)
+        except (NameError, SyntaxError):
+            pass
+        keys = path.split('.')
+        node = condition
+        for k in keys[:-1]:
+            node = node.setdefault(k, {})
+        node[keys[-1]] = value
+    return condition
+
+
+def list_entries(directory, stale_only=False):
+    """Print the entries of a cache.
+
+    Parameters
+    ----------
+    directory : str
+        The directory of the cache
+    stale_only : bool, optional
+        If True, only print entries which will never be used again because
+        the code of their components changed
+    """
+    cache = ResultCache(directory)
+    stale = set(cache.stale_keys())
+    keys = [k for k in cache.keys() if k in stale or not stale_only]
+    for key in keys:
+        entry = cache.load(key)
+        params = entry['params']
+        desc = params['desc'] if 'desc' in params else "Description N/A"
+        print("%s %s %d replication(s) %s%s" % (
+                key, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(entry['time'])),
+                len(entry['results']), desc, ' (stale)' if key in stale else ''))
+    print("%d entries, %d stale" % (len(keys), len(stale & set(keys))))
+
+
+def invalidate_entries(directory, condition=None, stale_only=False):
+    """Remove entries from a cache.
+
+    Parameters
+    ----------
+    directory : str
+        The directory of the cache
+    condition : dict, optional
+        Parameters that experiments must match to be removed. If not
+        specified, all entries are removed
+    stale_only : bool, optional
+        If True, only remove entries which will never be used again because
+        the code of their components changed
+    """
+    cache = ResultCache(directory)
+    if stale_only:
+        stale = cache.stale_keys()
+        for key in stale:
+            cache.remove(key)
+        n_removed = len(stale)
+    else:
+        n_removed = cache.invalidate(condition)
+    print("Removed %d entries" % n_removed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", help="The directory of the cache")
+    subparsers = parser.add_subparsers(dest="command")
+    list_parser = subparsers.add_parser("list", help="list cache entries")
+    list_parser.add_argument("--stale", action="store_true",
+                             help="only list stale entries")
+    inv_parser = subparsers.add_parser("invalidate", help="remove cache entries")
+    group = inv_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--all", action="store_true", help="remove all entries")
+    group.add_argument("--stale", action="store_true",
+                       help="remove entries whose components changed")
+    group.add_argument("-m", "--match", action="append",
+                       help="remove entries whose parameters match PATH=VALUE")
+    args = parser.parse_args()
+    if args.command == 'list':
+        list_entries(args.directory, args.stale)
+    else:
+        invalidate_entries(args.directory,
+                           _condition(args.match) if args.match else None,
+                           args.stale)
+
+if __name__ == "__main__":
+    main()